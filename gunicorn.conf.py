@@ -0,0 +1,48 @@
+"""
+Gunicorn configuration for the Curriculum Mapping Service
+
+Mapping, rating and upload endpoints spend most of their time waiting on
+Azure OpenAI or on large file transfers. Sync workers hold a whole process
+for that time, so one slow request starves everyone else on the worker.
+gevent workers let a single process interleave many such requests.
+
+Usage:
+    pip install gunicorn gevent
+    gunicorn -c gunicorn.conf.py "integration.app:create_app()"
+
+Environment overrides:
+    GUNICORN_WORKERS       Worker processes (default: 2 * CPU + 1)
+    GUNICORN_WORKER_CLASS  'gevent' (default when installed) or 'sync'
+    GUNICORN_CONNECTIONS   Concurrent requests per gevent worker (default: 1000)
+    GUNICORN_TIMEOUT       Worker timeout in seconds (default: 300)
+"""
+
+import multiprocessing
+import os
+
+try:
+    import gevent  # noqa: F401
+    _default_worker_class = 'gevent'
+except ImportError:
+    _default_worker_class = 'sync'
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5001')}"
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', _default_worker_class)
+worker_connections = int(os.getenv('GUNICORN_CONNECTIONS', '1000'))
+
+# Batched mapping of a large question bank can run for minutes
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))
+graceful_timeout = 30
+
+# Load the app once in the master and fork it into the workers (copy-on-write).
+# create_app checks the Azure OpenAI connection there once; each worker then
+# builds its own AuditEngine on first request (see integration.app._get_audit_engine).
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+# The gevent worker patches the stdlib itself; GEVENT=1 makes the integration
+# package patch at import time as well, before openai/httpx create sockets.
+raw_env = ['GEVENT=1'] if worker_class == 'gevent' else []
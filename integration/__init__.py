@@ -23,12 +23,26 @@ Components:
     - api: Flask API endpoints
     - auth: Authentication middleware
     - database: Database models and integration
+    - loaders: Tabular file loading with Parquet upload cache
+    - cache: In-process TTL/LRU cache
     - config: Configuration management
 """
 
 __version__ = "2.0.0"
 __author__ = "Inpods"
 
+import os
+
+# Under gunicorn's gevent workers (see gunicorn.conf.py) patch the stdlib before
+# openai/httpx are imported, so Azure OpenAI calls and file I/O yield to other
+# requests instead of blocking the worker.
+if os.getenv('GEVENT', '0') == '1':
+    try:
+        from gevent import monkey
+        monkey.patch_all()
+    except ImportError:
+        pass
+
 from .engine import AuditEngine, LibraryManager
 from .visualization import VisualizationEngine
 from .app import create_app
@@ -21,27 +21,215 @@ Usage:
 """
 
 from flask import Flask, Blueprint, request, jsonify, send_file, g
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import pandas as pd
+import numpy as np
+import io
 import os
+import json
+import uuid
+import shutil
+import time
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait
 from werkzeug.utils import secure_filename
 from datetime import datetime
-from functools import wraps
+from functools import wraps, lru_cache
+import itertools
 import logging
 
 from .config import Config, get_config
 from .engine import AuditEngine, LibraryManager
 from .visualization import VisualizationEngine
 from .auth import AuthMiddleware, log_action
+from .loaders import load_cached, load_column
 
 logger = logging.getLogger(__name__)
 
+# orjson (optional dependency): faster JSON responses, native numpy support
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.warning("orjson not installed. Using the standard library JSON encoder. Install with: pip install orjson")
+
 # Global instances (set during app creation)
-_audit_engine = None
+_audit_engine = None  # Created lazily per process, see _get_audit_engine()
 _viz_engine = None
 _library_manager = None
 _auth_middleware = None
 _config = None
+_connection_verified = False
+
+# Columns that may hold a question's mapping, in priority order (first non-empty wins)
+MAPPING_COLUMNS = (
+    'mapped_topic', 'mapped_objective', 'objective_id', 'Objective',
+    'mapped_competency', 'competency_id', 'mapped_skill', 'skill_id',
+    'mapped_nmc_competency', 'nmc_competency_id', 'mapped_id'
+)
+
+# Charts and exports get timestamped filenames and are never rewritten, so browsers
+# may keep them. Exports can hold question text, hence private and shorter-lived.
+CHART_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+EXPORT_CACHE_CONTROL = 'private, max-age=3600'
+
+# Copy uploads to disk in 512KB chunks (Werkzeug's save() uses a 16KB buffer)
+UPLOAD_CHUNK_SIZE = 1 << 19
+
+
+def _save_upload(file_storage, path):
+    """Stream an uploaded file to disk with a large copy buffer."""
+    with open(path, 'wb', buffering=0) as f:
+        shutil.copyfileobj(file_storage.stream, f, length=UPLOAD_CHUNK_SIZE)
+
+
+# Uploads are parsed off the request thread; the upload endpoints return 202 + job id.
+_PARSE_WORKERS = 4
+_parse_executor = None  # created on first submit, in the worker process
+_parse_executor_lock = threading.Lock()
+_pending_parses = {}  # upload path -> Future of the parse job covering it
+
+# Job status files older than this are swept; checked at most every JOB_SWEEP_INTERVAL
+JOB_STATUS_TTL = 3600
+JOB_SWEEP_INTERVAL = 300
+_last_job_sweep = 0.0
+
+
+def _get_parse_executor():
+    """
+    Executor for upload parse jobs.
+
+    Under gevent (GEVENT=1) the stdlib threads are monkey-patched into
+    greenlets, so a CPU-bound parse would block the whole worker; gevent's
+    ThreadPoolExecutor runs jobs on native OS threads instead. The parse
+    still needs the GIL for pure-Python stretches (PyArrow's CSV reader
+    releases it), but the hub keeps serving requests in between.
+    """
+    global _parse_executor
+    with _parse_executor_lock:
+        if _parse_executor is None:
+            if os.getenv('GEVENT', '0') == '1':
+                try:
+                    from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+                    _parse_executor = NativeThreadPoolExecutor(max_workers=_PARSE_WORKERS)
+                except ImportError:
+                    pass
+            if _parse_executor is None:
+                _parse_executor = ThreadPoolExecutor(max_workers=_PARSE_WORKERS,
+                                                     thread_name_prefix='upload-parse')
+        return _parse_executor
+
+
+def _sweep_job_files(jobs_dir):
+    """Delete job status files not updated for JOB_STATUS_TTL seconds (throttled)"""
+    global _last_job_sweep
+    now = time.time()
+    if now - _last_job_sweep < JOB_SWEEP_INTERVAL:
+        return
+    _last_job_sweep = now
+
+    cutoff = now - JOB_STATUS_TTL
+    try:
+        with os.scandir(jobs_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass  # Swept by another worker
+    except OSError as e:
+        logger.warning(f"Job status sweep failed: {e}")
+
+
+def _run_parse_job(status_path, files, columns_from=None):
+    """
+    Parse uploaded files (materializing their Parquet cache) and record the result.
+
+    Args:
+        status_path: JSON file the job status is written to
+        files: {count_key: upload path}, e.g. {'question_count': '.../q.csv'}
+        columns_from: Optional upload path whose column names are reported
+    """
+    try:
+        result = {'status': 'done'}
+        for count_key, path in files.items():
+            df = load_cached(path)
+            result[count_key] = len(df)
+            if path == columns_from:
+                result['columns'] = df.columns.tolist()
+    except Exception as e:
+        logger.error(f"Upload parse failed: {e}")
+        result = {'status': 'failed', 'error': str(e)}
+
+    # Replace atomically so a concurrent status poll never reads a partial file
+    tmp_path = f'{status_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    os.replace(tmp_path, status_path)
+
+
+@lru_cache(maxsize=16)
+def _reference_topics(reference_path, mtime_ns):
+    """
+    Topic list of a reference curriculum file, cached per file version.
+
+    mtime_ns is part of the cache key, so re-uploading a file under the
+    same name is picked up. Returns None if it has no topic column.
+    """
+    for column in ('Topic Area (CBME)', 'Topic Area'):
+        topics = load_column(reference_path, column)
+        if topics is not None:
+            return tuple(topics)
+    return None
+
+
+def _wait_for_parse(*paths):
+    """Block until any in-flight parse of these uploads (in this process) finishes."""
+    futures = [_pending_parses[path] for path in paths if path in _pending_parses]
+    if futures:
+        wait(futures)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Keys stay sorted and dates are HTTP dates, as with Flask's default
+    provider. Pretty-printed output (indent) and anything orjson rejects
+    (e.g. integers beyond 64 bits) go through the standard encoder.
+    """
+
+    option = (
+        orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS |
+        orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    ) if ORJSON_AVAILABLE else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.get('indent') is None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self.option).decode()
+            except orjson.JSONEncodeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def _get_audit_engine() -> AuditEngine:
+    """
+    Return this process's AuditEngine, creating it on first use.
+
+    The engine (and its Azure OpenAI connection pool) is never built in
+    create_app: with gunicorn's preload_app the factory runs once in the
+    master, and a pool opened there would be shared by every forked worker.
+    """
+    global _audit_engine
+    if _audit_engine is None:
+        _audit_engine = AuditEngine(_config.azure.to_dict())
+    return _audit_engine
 
 
 def create_app(config: Config = None) -> Flask:
@@ -54,7 +242,7 @@ def create_app(config: Config = None) -> Flask:
     Returns:
         Configured Flask application
     """
-    global _audit_engine, _viz_engine, _library_manager, _auth_middleware, _config
+    global _audit_engine, _viz_engine, _library_manager, _auth_middleware, _config, _connection_verified
 
     # Load config
     if config is None:
@@ -70,6 +258,9 @@ def create_app(config: Config = None) -> Flask:
     # Create Flask app
     app = Flask(__name__)
     app.config['MAX_CONTENT_LENGTH'] = config.storage.max_file_size_mb * 1024 * 1024
+    app.config['USE_X_SENDFILE'] = config.storage.use_x_sendfile
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
 
     # Setup CORS
     CORS(app, origins=config.cors_origins)
@@ -77,11 +268,18 @@ def create_app(config: Config = None) -> Flask:
     # Initialize engines
     print(f"[*] Initializing {config.service_name}...")
 
-    _audit_engine = AuditEngine(config.azure.to_dict())
-    if _audit_engine.test_connection():
-        print("[OK] Azure OpenAI connected successfully")
-    else:
-        raise ConnectionError("Failed to connect to Azure OpenAI")
+    # Verify Azure OpenAI once with a throwaway engine; under gunicorn with
+    # preload_app this runs in the master only, not once per worker
+    _audit_engine = None
+    probe = AuditEngine(config.azure.to_dict())
+    try:
+        if not probe.test_connection():
+            raise ConnectionError("Failed to connect to Azure OpenAI")
+    finally:
+        probe.client.close()
+
+    _connection_verified = True
+    print("[OK] Azure OpenAI connected successfully")
 
     _viz_engine = VisualizationEngine(output_folder=config.storage.insights_folder)
     _library_manager = LibraryManager(library_folder=config.storage.library_folder)
@@ -108,14 +306,63 @@ def create_blueprint(config: Config) -> Blueprint:
 
     bp = Blueprint('curriculum', __name__, url_prefix='/api')
 
+    # Storage folders, resolved once per blueprint instead of per request.
+    # Absolute, since send_file resolves relative paths against the app root.
+    upload_dir = Path(config.storage.upload_folder).resolve()
+    output_dir = Path(config.storage.output_folder).resolve()
+    insights_dir = Path(config.storage.insights_folder).resolve()
+
+    # Default library names: one timestamp per blueprint plus a counter, so bursts
+    # of saves neither collide nor format a datetime per request. The counter is
+    # per process (preloaded workers all fork with it at 1), so names carry the pid
+    library_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    library_counter = itertools.count(1)
+
+    # Upload parse job status files, shared by all workers through the filesystem.
+    # Kept JOB_STATUS_TTL seconds after their last update, then swept
+    jobs_dir = upload_dir / '.jobs'
+    jobs_dir.mkdir(parents=True, exist_ok=True)
+
     # Helper: Check allowed file extensions
+    allowed_extensions = frozenset(ext.lower() for ext in config.storage.allowed_extensions)
+
     def allowed_file(filename):
-        return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in config.storage.allowed_extensions
+        _, dot, ext = filename.rpartition('.')
+        return bool(dot) and ext.lower() in allowed_extensions
+
+    # Helper: Reject oversized bodies from the Content-Length header, before
+    # request.files makes Werkzeug read and spool the whole multipart stream
+    max_upload_bytes = config.storage.max_file_size_mb * 1024 * 1024
+
+    def upload_too_large():
+        return request.content_length is not None and request.content_length > max_upload_bytes
+
+    # g.current_user is None unless an auth decorator set it
+    _auth_middleware.init_app(bp)
 
     # Helper: Get current user (if authenticated)
     def get_current_user():
-        return getattr(g, 'current_user', None)
+        return g.current_user
+
+    # Helper: Parse uploaded files in the background, returns the job id
+    def submit_parse_job(files, columns_from=None):
+        _sweep_job_files(jobs_dir)
+
+        job_id = str(uuid.uuid4())
+        status_path = jobs_dir / f'{job_id}.json'
+        status_path.write_text(json.dumps({'status': 'pending'}), encoding='utf-8')
+
+        future = _get_parse_executor().submit(_run_parse_job, status_path, files, columns_from)
+        for path in files.values():
+            _pending_parses[path] = future
+
+        def release(done):
+            for path in files.values():
+                if _pending_parses.get(path) is done:
+                    del _pending_parses[path]
+
+        future.add_done_callback(release)
+        return job_id
 
     # ============================================
     # HEALTH & INFO ENDPOINTS
@@ -128,7 +375,7 @@ def create_blueprint(config: Config) -> Blueprint:
             'status': 'ok',
             'service': config.service_name,
             'version': config.version,
-            'azure_connected': _audit_engine is not None
+            'azure_connected': _connection_verified or _audit_engine is not None
         })
 
     @bp.route('/info', methods=['GET'])
@@ -153,6 +400,9 @@ def create_blueprint(config: Config) -> Blueprint:
     def upload_files():
         """Upload question bank and reference curriculum files"""
         try:
+            if upload_too_large():
+                return jsonify({'error': f'Upload exceeds {config.storage.max_file_size_mb}MB limit'}), 413
+
             if 'question_file' not in request.files or 'reference_file' not in request.files:
                 return jsonify({'error': 'Both question_file and reference_file required'}), 400
 
@@ -169,15 +419,17 @@ def create_blueprint(config: Config) -> Blueprint:
             question_filename = secure_filename(question_file.filename)
             reference_filename = secure_filename(reference_file.filename)
 
-            question_path = os.path.join(config.storage.upload_folder, question_filename)
-            reference_path = os.path.join(config.storage.upload_folder, reference_filename)
+            question_path = str(upload_dir / question_filename)
+            reference_path = str(upload_dir / reference_filename)
 
-            question_file.save(question_path)
-            reference_file.save(reference_path)
+            _save_upload(question_file, question_path)
+            _save_upload(reference_file, reference_path)
 
-            # Read and validate
-            question_df = pd.read_csv(question_path) if question_path.endswith('.csv') else pd.read_excel(question_path)
-            reference_df = pd.read_csv(reference_path) if reference_path.endswith('.csv') else pd.read_excel(reference_path)
+            # Parse and validate in the background (also materializes the Parquet cache)
+            job_id = submit_parse_job({
+                'question_count': question_path,
+                'reference_count': reference_path
+            })
 
             # Audit log
             user = get_current_user()
@@ -188,12 +440,12 @@ def create_blueprint(config: Config) -> Blueprint:
                 })
 
             return jsonify({
-                'status': 'success',
+                'status': 'accepted',
+                'job_id': job_id,
+                'status_url': f'/api/upload-status/{job_id}',
                 'question_file': question_filename,
-                'reference_file': reference_filename,
-                'question_count': len(question_df),
-                'reference_count': len(reference_df)
-            })
+                'reference_file': reference_filename
+            }), 202
 
         except Exception as e:
             logger.error(f"Upload failed: {e}")
@@ -212,10 +464,12 @@ def create_blueprint(config: Config) -> Blueprint:
             if not all([question_file, reference_file, dimension]):
                 return jsonify({'error': 'Missing required parameters'}), 400
 
-            question_path = os.path.join(config.storage.upload_folder, question_file)
-            reference_path = os.path.join(config.storage.upload_folder, reference_file)
+            question_path = str(upload_dir / question_file)
+            reference_path = str(upload_dir / reference_file)
+
+            _wait_for_parse(question_path, reference_path)
 
-            result = _audit_engine.run_audit(
+            result = _get_audit_engine().run_audit(
                 question_csv=question_path,
                 reference_csv=reference_path,
                 dimension=dimension
@@ -243,10 +497,12 @@ def create_blueprint(config: Config) -> Blueprint:
 
             batch_size = max(1, min(10, int(batch_size)))
 
-            question_path = os.path.join(config.storage.upload_folder, question_file)
-            reference_path = os.path.join(config.storage.upload_folder, reference_file)
+            question_path = str(upload_dir / question_file)
+            reference_path = str(upload_dir / reference_file)
+
+            _wait_for_parse(question_path, reference_path)
 
-            result = _audit_engine.run_audit_batched(
+            result = _get_audit_engine().run_audit_batched(
                 question_csv=question_path,
                 reference_csv=reference_path,
                 dimension=dimension,
@@ -273,9 +529,11 @@ def create_blueprint(config: Config) -> Blueprint:
             if not all([question_file, recommendations, selected_indices is not None, dimension]):
                 return jsonify({'error': 'Missing required parameters'}), 400
 
-            question_path = os.path.join(config.storage.upload_folder, question_file)
+            question_path = str(upload_dir / question_file)
 
-            output_path = _audit_engine.apply_and_export(
+            _wait_for_parse(question_path)
+
+            output_path = _get_audit_engine().apply_and_export(
                 question_csv=question_path,
                 recommendations=recommendations,
                 selected_indices=selected_indices,
@@ -297,11 +555,16 @@ def create_blueprint(config: Config) -> Blueprint:
     def download_file(filename):
         """Download generated Excel file"""
         try:
-            file_path = os.path.join(config.storage.output_folder, filename)
-            if os.path.exists(file_path):
-                return send_file(file_path, as_attachment=True)
-            else:
+            file_path = output_dir / filename
+            try:
+                st = file_path.stat()
+            except FileNotFoundError:
                 return jsonify({'error': 'File not found'}), 404
+
+            response = send_file(file_path, as_attachment=True, conditional=True,
+                                 etag=f'{st.st_mtime_ns:x}', last_modified=st.st_mtime)
+            response.headers['Cache-Control'] = EXPORT_CACHE_CONTROL
+            return response
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -314,6 +577,9 @@ def create_blueprint(config: Config) -> Blueprint:
     def upload_mapped_file():
         """Upload a file with existing mappings"""
         try:
+            if upload_too_large():
+                return jsonify({'error': f'Upload exceeds {config.storage.max_file_size_mb}MB limit'}), 413
+
             if 'mapped_file' not in request.files:
                 return jsonify({'error': 'mapped_file required'}), 400
 
@@ -323,41 +589,56 @@ def create_blueprint(config: Config) -> Blueprint:
             if mapped_file.filename == '':
                 return jsonify({'error': 'No file selected'}), 400
 
+            # Validate both files before writing either to disk
+            has_reference = reference_file is not None and reference_file.filename != ''
+            if not allowed_file(mapped_file.filename) or \
+                    (has_reference and not allowed_file(reference_file.filename)):
+                return jsonify({'error': 'Only CSV/Excel files allowed'}), 400
+
             # Save mapped file
             mapped_filename = secure_filename(mapped_file.filename)
-            mapped_path = os.path.join(config.storage.upload_folder, mapped_filename)
-            mapped_file.save(mapped_path)
-
-            # Read mapped file
-            if mapped_path.endswith('.csv'):
-                mapped_df = pd.read_csv(mapped_path)
-            elif mapped_path.endswith('.ods'):
-                mapped_df = pd.read_excel(mapped_path, engine='odf')
-            else:
-                mapped_df = pd.read_excel(mapped_path, engine='openpyxl')
+            mapped_path = str(upload_dir / mapped_filename)
+            _save_upload(mapped_file, mapped_path)
 
             response = {
-                'status': 'success',
-                'mapped_file': mapped_filename,
-                'question_count': len(mapped_df),
-                'columns': mapped_df.columns.tolist()
+                'status': 'accepted',
+                'mapped_file': mapped_filename
             }
+            files = {'question_count': mapped_path}
 
             # Save reference file if provided
-            if reference_file and reference_file.filename != '':
+            if has_reference:
                 reference_filename = secure_filename(reference_file.filename)
-                reference_path = os.path.join(config.storage.upload_folder, reference_filename)
-                reference_file.save(reference_path)
-                reference_df = pd.read_csv(reference_path) if reference_path.endswith('.csv') else pd.read_excel(reference_path)
+                reference_path = str(upload_dir / reference_filename)
+                _save_upload(reference_file, reference_path)
                 response['reference_file'] = reference_filename
-                response['reference_count'] = len(reference_df)
+                files['reference_count'] = reference_path
+
+            # Parse in the background (question count, columns, Parquet cache)
+            job_id = submit_parse_job(files, columns_from=mapped_path)
+            response['job_id'] = job_id
+            response['status_url'] = f'/api/upload-status/{job_id}'
 
-            return jsonify(response)
+            return jsonify(response), 202
 
         except Exception as e:
             logger.error(f"Upload mapped failed: {e}")
             return jsonify({'error': str(e)}), 500
 
+    @bp.route('/upload-status/<job_id>', methods=['GET'])
+    @_auth_middleware.optional_auth
+    def upload_status(job_id):
+        """Poll the background parse of an upload (counts once done)"""
+        try:
+            status = json.loads((jobs_dir / f'{secure_filename(job_id)}.json').read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return jsonify({'error': 'Job not found'}), 404
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+        status['job_id'] = job_id
+        return jsonify(status)
+
     @bp.route('/rate-mappings', methods=['POST'])
     @_auth_middleware.optional_auth
     def rate_mappings():
@@ -377,10 +658,12 @@ def create_blueprint(config: Config) -> Blueprint:
 
             batch_size = max(1, min(10, int(batch_size)))
 
-            mapped_path = os.path.join(config.storage.upload_folder, mapped_file)
-            reference_path = os.path.join(config.storage.upload_folder, reference_file)
+            mapped_path = str(upload_dir / mapped_file)
+            reference_path = str(upload_dir / reference_file)
 
-            result = _audit_engine.rate_existing_mappings(
+            _wait_for_parse(mapped_path, reference_path)
+
+            result = _get_audit_engine().rate_existing_mappings(
                 mapped_file=mapped_path,
                 reference_csv=reference_path,
                 dimension=dimension,
@@ -409,40 +692,50 @@ def create_blueprint(config: Config) -> Blueprint:
             if not mapped_file:
                 return jsonify({'error': 'mapped_file required'}), 400
 
-            mapped_path = os.path.join(config.storage.upload_folder, mapped_file)
+            mapped_path = str(upload_dir / mapped_file)
 
             # Load mapped data
-            if mapped_path.endswith('.csv'):
-                mapped_df = pd.read_csv(mapped_path)
-            elif mapped_path.endswith('.ods'):
-                mapped_df = pd.read_excel(mapped_path, engine='odf')
-            else:
-                mapped_df = pd.read_excel(mapped_path, engine='openpyxl')
+            _wait_for_parse(mapped_path)
+            mapped_df = load_cached(mapped_path)
+
+            # Build mapping data structure (vectorized: first non-empty mapping column per row)
+            present = [col for col in MAPPING_COLUMNS if col in mapped_df.columns]
 
-            # Build mapping data structure
             coverage = {}
-            recommendations = []
-
-            for idx, row in mapped_df.iterrows():
-                topic = None
-                for col in ['mapped_topic', 'mapped_objective', 'objective_id', 'Objective',
-                            'mapped_competency', 'competency_id', 'mapped_skill', 'skill_id',
-                            'mapped_nmc_competency', 'nmc_competency_id', 'mapped_id']:
-                    if col in row and pd.notna(row.get(col)) and row.get(col):
-                        topic = str(row.get(col)).strip()
-                        break
-
-                if topic:
-                    coverage[topic] = coverage.get(topic, 0) + 1
-
-                confidence = row.get('confidence_score', 0.0)
-                if pd.isna(confidence):
-                    confidence = 0.85
-
-                recommendations.append({
-                    'confidence': float(confidence),
-                    'question_num': row.get('Question Number', f'Q{idx+1}')
-                })
+            if present:
+                if len(present) == 1:
+                    first_mapping = mapped_df[present[0]]
+                    first_mapping = first_mapping[
+                        first_mapping.notna() & (first_mapping != '') & (first_mapping != 0)
+                    ]
+                else:
+                    candidates = mapped_df[present].astype(object)
+                    candidates = candidates.where(candidates.notna() & (candidates != '') & (candidates != 0))
+                    first_mapping = candidates.bfill(axis=1).iloc[:, 0]
+
+                raw_counts = first_mapping.value_counts(sort=False)
+
+                # Topics repeat heavily, so normalize each distinct value once, not once per row
+                for value, count in zip(raw_counts.index, raw_counts.tolist()):
+                    topic = str(value).strip()
+                    if topic:
+                        coverage[topic] = coverage.get(topic, 0) + count
+
+            if 'confidence_score' in mapped_df.columns:
+                confidences = mapped_df['confidence_score'].fillna(0.85).to_numpy(dtype=float)
+            else:
+                confidences = np.zeros(len(mapped_df))
+
+            if 'Question Number' in mapped_df.columns:
+                question_nums = mapped_df['Question Number'].tolist()
+            else:
+                question_nums = [f'Q{idx+1}' for idx in mapped_df.index]
+
+            # Columnar (one array/list per field) rather than one dict per question
+            recommendations = {
+                'confidence': confidences,
+                'question_num': question_nums
+            }
 
             mapping_data = {
                 'coverage': coverage,
@@ -452,13 +745,14 @@ def create_blueprint(config: Config) -> Blueprint:
             # Get reference topics
             reference_topics = list(coverage.keys())
             if reference_file:
-                reference_path = os.path.join(config.storage.upload_folder, reference_file)
-                if os.path.exists(reference_path):
-                    ref_df = pd.read_csv(reference_path) if reference_path.endswith('.csv') else pd.read_excel(reference_path)
-                    if 'Topic Area (CBME)' in ref_df.columns:
-                        reference_topics = ref_df['Topic Area (CBME)'].dropna().tolist()
-                    elif 'Topic Area' in ref_df.columns:
-                        reference_topics = ref_df['Topic Area'].dropna().tolist()
+                reference_path = str(upload_dir / reference_file)
+                _wait_for_parse(reference_path)
+                try:
+                    topics = _reference_topics(reference_path, os.stat(reference_path).st_mtime_ns)
+                    if topics is not None:
+                        reference_topics = list(topics)
+                except FileNotFoundError:
+                    pass
 
             # Generate all charts
             charts = _viz_engine.generate_all_insights(mapping_data, reference_topics)
@@ -473,9 +767,9 @@ def create_blueprint(config: Config) -> Blueprint:
                 'status': 'success',
                 'charts': chart_urls,
                 'summary': {
-                    'total_questions': len(recommendations),
+                    'total_questions': len(confidences),
                     'topics_covered': len(coverage),
-                    'average_confidence': sum(r['confidence'] for r in recommendations) / len(recommendations) if recommendations else 0,
+                    'average_confidence': float(confidences.mean()) if len(confidences) else 0,
                     'coverage': coverage
                 }
             })
@@ -488,11 +782,25 @@ def create_blueprint(config: Config) -> Blueprint:
     def download_insight(filename):
         """Download insight chart image"""
         try:
-            file_path = os.path.join(config.storage.insights_folder, filename)
-            if os.path.exists(file_path):
-                return send_file(file_path, mimetype='image/png')
-            else:
+            # Charts this worker rendered are served from memory, same ETag as the file
+            cached = _viz_engine.get_png(filename)
+            if cached is not None:
+                data, mtime_ns, mtime = cached
+                response = send_file(io.BytesIO(data), mimetype='image/png', conditional=True,
+                                     etag=f'{mtime_ns:x}', last_modified=mtime)
+                response.headers['Cache-Control'] = CHART_CACHE_CONTROL
+                return response
+
+            file_path = insights_dir / filename
+            try:
+                st = file_path.stat()
+            except FileNotFoundError:
                 return jsonify({'error': 'Chart not found'}), 404
+
+            response = send_file(file_path, mimetype='image/png', conditional=True,
+                                 etag=f'{st.st_mtime_ns:x}', last_modified=st.st_mtime)
+            response.headers['Cache-Control'] = CHART_CACHE_CONTROL
+            return response
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -520,7 +828,9 @@ def create_blueprint(config: Config) -> Blueprint:
         """Save current mapping results to library"""
         try:
             data = request.json
-            name = data.get('name', f'Mapping_{datetime.now().strftime("%Y%m%d_%H%M%S")}')
+            name = data.get('name')
+            if name is None:
+                name = f'Mapping_{library_stamp}_{os.getpid()}_{next(library_counter)}'
             recommendations = data.get('recommendations', [])
             dimension = data.get('dimension', 'area_topics')
             mode = data.get('mode', 'A')
@@ -651,8 +961,8 @@ def register_blueprint(app: Flask, config: Config = None):
 
     _config = config
 
-    # Initialize engines
-    _audit_engine = AuditEngine(config.azure.to_dict())
+    # Initialize engines (the AuditEngine is created on first request)
+    _audit_engine = None
     _viz_engine = VisualizationEngine(output_folder=config.storage.insights_folder)
     _library_manager = LibraryManager(library_folder=config.storage.library_folder)
     _auth_middleware = AuthMiddleware(config.auth)
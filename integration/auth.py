@@ -5,17 +5,131 @@ Provides pluggable authentication for the Curriculum Mapping Service.
 Supports: JWT, API Keys, OAuth2, and custom auth providers.
 """
 
-from functools import wraps
+from functools import lru_cache, wraps
 from flask import request, jsonify, g
-from datetime import datetime, timedelta
+from datetime import datetime
+import base64
 import hashlib
 import hmac
 import json
-from typing import Optional, Callable, Dict, Any
+import threading
+import time
+from typing import Optional, Callable, Dict, Any, List
 import logging
 
+from .cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# PyJWT imports (optional dependency, only needed for the 'jwt' provider)
+try:
+    import jwt
+    from jwt.algorithms import get_default_algorithms
+    JWT_AVAILABLE = True
+except ImportError:
+    jwt = None
+    JWT_AVAILABLE = False
+
+# requests (optional dependency, only needed for the 'oauth2' provider)
+try:
+    import requests as http_requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+# orjson (optional dependency): faster JWT payload and audit log serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(obj) -> str:
+    """JSON-encode with orjson when installed, the standard library otherwise"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj).decode()
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj)
+
+
+class _LazyJSON:
+    """Log argument that JSON-encodes its object only when formatted"""
+    __slots__ = ('obj',)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return _dumps(self.obj)
+
+
+if JWT_AVAILABLE and ORJSON_AVAILABLE and hasattr(jwt.PyJWT, '_encode_payload') \
+        and hasattr(jwt.PyJWT, '_decode_payload'):
+    class _OrjsonJWT(jwt.PyJWT):
+        """PyJWT with claims (de)serialized by orjson, via its documented override hooks"""
+
+        def _encode_payload(self, payload, headers=None, json_encoder=None) -> bytes:
+            if json_encoder is None:
+                try:
+                    return orjson.dumps(payload)
+                except orjson.JSONEncodeError:
+                    pass
+            return super()._encode_payload(payload, headers=headers, json_encoder=json_encoder)
+
+        def _decode_payload(self, decoded) -> Dict[str, Any]:
+            try:
+                payload = orjson.loads(decoded['payload'])
+            except orjson.JSONDecodeError as e:
+                raise jwt.DecodeError(f"Invalid payload string: {e}") from e
+            if not isinstance(payload, dict):
+                raise jwt.DecodeError("Invalid payload string: must be a json object")
+            return payload
+
+    _jwt_api = _OrjsonJWT()
+else:
+    _jwt_api = jwt
+
+
+def constant_time_compare(a, b) -> bool:
+    """
+    Compare two secrets (str or bytes) in time independent of where they differ.
+
+    Use this instead of ``==`` whenever a token or key is checked against a
+    stored value, so response timing does not leak matching prefixes.
+    """
+    if isinstance(a, str):
+        a = a.encode()
+    if isinstance(b, str):
+        b = b.encode()
+    return hmac.compare_digest(a, b)
+
+
+_DIGEST_SIZE = 32  # SHA-256
+
+# Compared against on a lookup miss, so misses cost the same as hits
+_NO_DIGEST = bytes(_DIGEST_SIZE)
+
+
+def _b64url(data: bytes) -> bytes:
+    """Unpadded base64url, as used in JWT segments"""
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _hash_key(api_key: str) -> bytes:
+    """SHA-256 digest of an API key; keys are only stored and cached in this form"""
+    return hashlib.sha256(api_key.encode()).digest()
+
+
+def _extract_bearer(req) -> Optional[str]:
+    """Return the token from an 'Authorization: Bearer <token>' header, or None"""
+    header = req.headers.get('Authorization')
+    if header is None or len(header) < 8 or header[:7] != 'Bearer ':
+        return None
+    return header[7:]
+
 
 class AuthError(Exception):
     """Authentication/Authorization error"""
@@ -28,6 +142,10 @@ class AuthError(Exception):
 class BaseAuthProvider:
     """Base class for authentication providers"""
 
+    # Header carrying this provider's credentials; None if it cannot be declared.
+    # CompositeAuthProvider skips providers whose header is absent.
+    auth_header: Optional[str] = None
+
     def authenticate(self, request) -> Optional[Dict[str, Any]]:
         """
         Authenticate a request.
@@ -45,38 +163,50 @@ class BaseAuthProvider:
 class JWTAuthProvider(BaseAuthProvider):
     """JWT-based authentication"""
 
+    auth_header = 'Authorization'
+
     def __init__(self, secret_key: str, expiry_hours: int = 24, algorithm: str = 'HS256'):
         self.secret_key = secret_key
         self.expiry_hours = expiry_hours
         self.algorithm = algorithm
+        self._expiry_seconds = int(expiry_hours * 3600)
 
-        # Try to import PyJWT
-        try:
-            import jwt
-            self.jwt = jwt
-        except ImportError:
+        # PyJWT checks signature and expiry (when an exp claim is present) in one decode pass
+        self._decode_options = {'verify_signature': True, 'verify_exp': True}
+
+        self.jwt = jwt
+        if not JWT_AVAILABLE:
             logger.warning("PyJWT not installed. Install with: pip install PyJWT")
-            self.jwt = None
+            return
+
+        # Resolve the algorithm and prepare the key once. PyJWT passes prepared
+        # keys straight through, so encode/decode skip key parsing (PEM loading
+        # for RS*/ES*); asymmetric algorithms verify with the public half.
+        alg_obj = get_default_algorithms().get(algorithm)  # None if unsupported; PyJWT reports it on use
+        self._signing_key = alg_obj.prepare_key(secret_key) if alg_obj else secret_key
+        self._verifying_key = (
+            self._signing_key.public_key() if hasattr(self._signing_key, 'public_key')
+            else self._signing_key
+        )
+
+        # The JOSE header is the same for every token: encode it once, and have
+        # get_token only encodes the claims and signs (the token layout jwt.encode produces)
+        self._alg_obj = alg_obj
+        header = json.dumps({'alg': algorithm, 'typ': 'JWT'}, separators=(',', ':'), sort_keys=True)
+        self._header_segment = _b64url(header.encode()) + b'.'
 
     def authenticate(self, request) -> Optional[Dict[str, Any]]:
         """Validate JWT token from Authorization header"""
         if not self.jwt:
             raise AuthError("JWT authentication not available", 500)
 
-        auth_header = request.headers.get('Authorization', '')
-
-        if not auth_header.startswith('Bearer '):
+        token = _extract_bearer(request)
+        if token is None:
             return None
 
-        token = auth_header[7:]  # Remove "Bearer " prefix
-
         try:
-            payload = self.jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-
-            # Check expiration
-            exp = payload.get('exp')
-            if exp and datetime.utcnow().timestamp() > exp:
-                raise AuthError("Token expired")
+            payload = _jwt_api.decode(token, self._verifying_key, algorithms=[self.algorithm],
+                                      options=self._decode_options)
 
             return {
                 'user_id': payload.get('sub'),
@@ -85,6 +215,8 @@ class JWTAuthProvider(BaseAuthProvider):
                 'metadata': payload.get('metadata', {})
             }
 
+        except self.jwt.ExpiredSignatureError:
+            raise AuthError("Token expired")
         except self.jwt.InvalidTokenError as e:
             raise AuthError(f"Invalid token: {str(e)}")
 
@@ -93,33 +225,153 @@ class JWTAuthProvider(BaseAuthProvider):
         if not self.jwt:
             raise AuthError("JWT authentication not available", 500)
 
+        now = int(time.time())
         payload = {
             'sub': user_info.get('user_id'),
             'email': user_info.get('email'),
             'permissions': user_info.get('permissions', []),
             'metadata': user_info.get('metadata', {}),
-            'iat': datetime.utcnow().timestamp(),
-            'exp': (datetime.utcnow() + timedelta(hours=self.expiry_hours)).timestamp()
+            'iat': now,
+            'exp': now + self._expiry_seconds
         }
 
-        return self.jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+        if self._alg_obj is None:
+            return _jwt_api.encode(payload, self._signing_key, algorithm=self.algorithm)
+
+        claims = None
+        if ORJSON_AVAILABLE:
+            try:
+                # Non-str metadata keys become strings, as with json.dumps
+                claims = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+            except orjson.JSONEncodeError:
+                pass
+        if claims is None:
+            claims = json.dumps(payload, separators=(',', ':')).encode()
+        signing_input = self._header_segment + _b64url(claims)
+        signature = self._alg_obj.sign(signing_input, self._signing_key)
+        return (signing_input + b'.' + _b64url(signature)).decode()
 
 
 class APIKeyAuthProvider(BaseAuthProvider):
-    """API Key-based authentication"""
+    """
+    API Key-based authentication
 
-    def __init__(self, header_name: str = 'X-API-Key', validate_func: Callable = None):
+    Successful validations are cached for ``cache_ttl`` seconds (LRU-bounded to
+    ``cache_size`` keys), so a real ``validate_func`` (DB lookup + hash compare)
+    runs at most once per key per TTL. Cache entries are keyed by the key's
+    SHA-256, never the raw key. Failed validations are not cached.
+
+    The built-in store keeps parallel arrays: the SHA-256 digests packed into
+    one ``bytearray`` (32 bytes each), the user infos in a list, and a
+    digest -> position index. Scans (e.g. revoking all keys of a user) walk
+    the contiguous list instead of a dict of dicts.
+    """
+
+    def __init__(self, header_name: str = 'X-API-Key', validate_func: Callable = None,
+                 cache_ttl: float = 10.0, cache_size: int = 10000):
         self.header_name = header_name
+        self.auth_header = header_name
         self.validate_func = validate_func or self._default_validate
-        self._api_keys = {}  # In-memory store for demo
+
+        # In-memory store for demo
+        self._hashes = bytearray()  # digest i at [i*32:(i+1)*32]
+        self._infos = []            # user_info i
+        self._index = {}            # digest -> i
+
+        self._cache = TTLCache(cache_ttl, cache_size)  # sha256(api_key) -> user_info
 
     def _default_validate(self, api_key: str) -> Optional[Dict[str, Any]]:
-        """Default validation using in-memory store"""
-        return self._api_keys.get(api_key)
+        """
+        Default validation using in-memory store.
+
+        Keys are looked up by digest and confirmed with a constant-time
+        compare against the stored digest; a miss compares against a dummy
+        digest so hits and misses take the same time.
+        """
+        digest = _hash_key(api_key)
+        idx = self._index.get(digest)
+        if idx is None:
+            constant_time_compare(_NO_DIGEST, digest)
+            return None
+        offset = idx * _DIGEST_SIZE
+        if constant_time_compare(self._hashes[offset:offset + _DIGEST_SIZE], digest):
+            return self._infos[idx]
+        return None
+
+    def _store(self, digest: bytes, user_info: Dict[str, Any]):
+        """Insert or replace the entry for a digest"""
+        idx = self._index.get(digest)
+        if idx is None:
+            self._index[digest] = len(self._infos)
+            self._hashes += digest
+            self._infos.append(user_info)
+        else:
+            self._infos[idx] = user_info
+
+    def _remove(self, digest: bytes) -> bool:
+        """Delete the entry for a digest, moving the last entry into its slot"""
+        idx = self._index.pop(digest, None)
+        if idx is None:
+            return False
+
+        last = len(self._infos) - 1
+        if idx != last:
+            moved = bytes(self._hashes[last * _DIGEST_SIZE:])
+            self._hashes[idx * _DIGEST_SIZE:(idx + 1) * _DIGEST_SIZE] = moved
+            self._infos[idx] = self._infos[last]
+            self._index[moved] = idx
+        del self._hashes[last * _DIGEST_SIZE:]
+        self._infos.pop()
+        return True
 
     def register_key(self, api_key: str, user_info: Dict[str, Any]):
         """Register an API key (for demo/testing)"""
-        self._api_keys[api_key] = user_info
+        self._store(_hash_key(api_key), user_info)
+        self._evict(api_key)
+
+    def bulk_register(self, api_keys: List[str], user_infos: List[Dict[str, Any]]):
+        """
+        Register many API keys at once (e.g. provisioning from a database at startup).
+
+        Args:
+            api_keys: Raw API keys
+            user_infos: User info dicts, parallel to api_keys
+        """
+        if len(api_keys) != len(user_infos):
+            raise ValueError("api_keys and user_infos must have the same length")
+
+        sha256 = hashlib.sha256
+        store = self._store
+        for api_key, user_info in zip(api_keys, user_infos):
+            store(sha256(api_key.encode()).digest(), user_info)
+        self._cache.clear()
+
+    def revoke(self, api_key: str):
+        """Revoke an API key and drop any cached validation for it"""
+        self._remove(_hash_key(api_key))
+        self._evict(api_key)
+
+    def revoke_user(self, user_id: str) -> int:
+        """
+        Revoke every API key registered for a user.
+
+        Returns:
+            Number of keys revoked
+        """
+        doomed = [
+            bytes(self._hashes[i * _DIGEST_SIZE:(i + 1) * _DIGEST_SIZE])
+            for i, info in enumerate(self._infos)
+            if info.get('user_id') == user_id
+        ]
+        for digest in doomed:
+            self._remove(digest)
+        if doomed:
+            self._cache.clear()
+        return len(doomed)
+
+    def _evict(self, api_key: str):
+        """Remove a key's cached validation so the next request re-validates"""
+        self._cache.pop(_hash_key(api_key))
 
     def authenticate(self, request) -> Optional[Dict[str, Any]]:
         """Validate API key from header"""
@@ -128,51 +380,82 @@ class APIKeyAuthProvider(BaseAuthProvider):
         if not api_key:
             return None
 
+        digest = _hash_key(api_key)
+        user_info = self._cache.get(digest)
+        if user_info is not None:
+            return user_info
+
         user_info = self.validate_func(api_key)
 
         if not user_info:
             raise AuthError("Invalid API key")
 
+        self._cache.set(digest, user_info)
         return user_info
 
     def get_token(self, user_info: Dict[str, Any]) -> str:
         """Generate an API key (for demo purposes)"""
         import secrets
         api_key = secrets.token_urlsafe(32)
-        self._api_keys[api_key] = user_info
+        self._store(_hash_key(api_key), user_info)
         return api_key
 
 
 class OAuth2AuthProvider(BaseAuthProvider):
-    """OAuth2-based authentication"""
+    """
+    OAuth2-based authentication
+
+    User info is fetched over a pooled keep-alive session, and successful
+    lookups are cached for ``cache_ttl`` seconds per access token (keyed by
+    its SHA-256), so repeat requests skip the round-trip to the provider.
+    """
+
+    auth_header = 'Authorization'
 
     def __init__(self, client_id: str, client_secret: str,
                  authorize_url: str, token_url: str,
-                 user_info_url: str = None):
+                 user_info_url: str = None, timeout: float = 5.0,
+                 cache_ttl: float = 60.0, cache_size: int = 10000):
         self.client_id = client_id
         self.client_secret = client_secret
         self.authorize_url = authorize_url
         self.token_url = token_url
         self.user_info_url = user_info_url
+        self.timeout = timeout
+        self._cache = TTLCache(cache_ttl, cache_size)  # sha256(access_token) -> user_info
+
+        if REQUESTS_AVAILABLE:
+            self._session = http_requests.Session()
+            adapter = http_requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=100)
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+        else:
+            logger.warning("requests not installed. Install with: pip install requests")
+            self._session = None
 
     def authenticate(self, request) -> Optional[Dict[str, Any]]:
         """Validate OAuth2 access token"""
-        auth_header = request.headers.get('Authorization', '')
-
-        if not auth_header.startswith('Bearer '):
+        access_token = _extract_bearer(request)
+        if access_token is None:
             return None
 
-        access_token = auth_header[7:]
-
         if not self.user_info_url:
             raise AuthError("OAuth2 user info URL not configured", 500)
 
+        if self._session is None:
+            raise AuthError("OAuth2 authentication not available", 500)
+
+        token_digest = _hash_key(access_token)
+        user_info = self._cache.get(token_digest)
+        if user_info is not None:
+            return user_info
+
         # Fetch user info from OAuth2 provider
         try:
-            import requests as http_requests
-            response = http_requests.get(
+            response = self._session.get(
                 self.user_info_url,
-                headers={'Authorization': f'Bearer {access_token}'}
+                headers={'Authorization': f'Bearer {access_token}'},
+                timeout=self.timeout
             )
 
             if response.status_code != 200:
@@ -180,12 +463,14 @@ class OAuth2AuthProvider(BaseAuthProvider):
 
             user_data = response.json()
 
-            return {
+            user_info = {
                 'user_id': user_data.get('sub') or user_data.get('id'),
                 'email': user_data.get('email'),
                 'name': user_data.get('name'),
                 'permissions': user_data.get('permissions', [])
             }
+            self._cache.set(token_digest, user_info)
+            return user_info
 
         except Exception as e:
             raise AuthError(f"OAuth2 validation failed: {str(e)}")
@@ -200,10 +485,14 @@ class CompositeAuthProvider(BaseAuthProvider):
 
     def __init__(self, providers: list):
         self.providers = providers
+        self._dispatch = [(getattr(p, 'auth_header', None), p) for p in providers]
 
     def authenticate(self, request) -> Optional[Dict[str, Any]]:
-        """Try each provider in order"""
-        for provider in self.providers:
+        """Try each provider in order, skipping those whose credential header is absent"""
+        headers = request.headers
+        for header, provider in self._dispatch:
+            if header is not None and header not in headers:
+                continue
             try:
                 result = provider.authenticate(request)
                 if result:
@@ -213,12 +502,17 @@ class CompositeAuthProvider(BaseAuthProvider):
         return None
 
 
+def _reset_current_user():
+    g.current_user = None
+
+
 class AuthMiddleware:
     """
     Authentication middleware for Flask.
 
     Usage:
         auth = AuthMiddleware(config)
+        auth.init_app(app)  # or a Blueprint
 
         @app.route('/api/protected')
         @auth.require_auth
@@ -242,6 +536,22 @@ class AuthMiddleware:
         self.config = config
         self.provider = self._create_provider()
 
+        # Every permission name seen gets one bit, so a user's permissions and
+        # an endpoint's requirement each reduce to an int and checks to one AND
+        self._perm_bits = {'admin': 1}
+        self._perm_lock = threading.Lock()
+        # Masks memoized per distinct permission list; user dicts are left untouched
+        self._mask_for = lru_cache(maxsize=1024)(self._permissions_mask)
+
+    def init_app(self, app):
+        """
+        Register a before_request hook that resets g.current_user to None.
+
+        Args:
+            app: Flask app or Blueprint whose views use this middleware
+        """
+        app.before_request(_reset_current_user)
+
     def _create_provider(self) -> BaseAuthProvider:
         """Create the appropriate auth provider"""
         if not self.config.enabled:
@@ -263,16 +573,50 @@ class AuthMiddleware:
                 authorize_url=self.config.oauth2_authorize_url,
                 token_url=self.config.oauth2_token_url
             )
+        elif self.config.provider == 'custom':
+            return None  # Assigned by the caller: auth_middleware.provider = MyAuthProvider()
         else:
             raise ValueError(f"Unknown auth provider: {self.config.provider}")
 
+    # The decorators below check config.enabled once, when applied (configs are
+    # immutable): with auth disabled they return the view unchanged. The provider
+    # is still read per request, since a custom one may be assigned afterwards.
+
+    def _perm_bit(self, permission: str) -> int:
+        """Bit assigned to a permission name (assigned on first use)"""
+        bit = self._perm_bits.get(permission)
+        if bit is None:
+            with self._perm_lock:
+                bit = self._perm_bits.get(permission)
+                if bit is None:
+                    bit = 1 << len(self._perm_bits)
+                    self._perm_bits[permission] = bit
+        return bit
+
+    def _permissions_mask(self, permissions: tuple) -> int:
+        """OR of the bits of a tuple of permission names"""
+        mask = 0
+        for permission in permissions:
+            mask |= self._perm_bit(permission)
+        return mask
+
+    def _perm_mask(self, user: Dict[str, Any]) -> int:
+        """
+        Bitmask of a user's permissions, memoized by the permission list itself.
+
+        Keyed on the list's contents, so a changed list gets a new mask. Memoized
+        masks stay valid as new names get bits, since every name in the list
+        already has one.
+        """
+        return self._mask_for(tuple(user.get('permissions') or ()))
+
     def require_auth(self, f: Callable) -> Callable:
         """Decorator to require authentication"""
+        if not self.config.enabled:
+            return f
+
         @wraps(f)
         def decorated(*args, **kwargs):
-            if not self.config.enabled:
-                return f(*args, **kwargs)
-
             try:
                 user = self.provider.authenticate(request)
                 if not user:
@@ -288,20 +632,23 @@ class AuthMiddleware:
 
     def require_permission(self, permission: str) -> Callable:
         """Decorator to require a specific permission"""
+        # Either permission grants access; built once per decorated endpoint
+        required_mask = self._perm_bit(permission) | self._perm_bit('admin')
+        denied = {'error': f'Permission denied: {permission} required'}
+
         def decorator(f: Callable) -> Callable:
+            if not self.config.enabled:
+                return f
+
             @wraps(f)
             def decorated(*args, **kwargs):
-                if not self.config.enabled:
-                    return f(*args, **kwargs)
-
                 try:
                     user = self.provider.authenticate(request)
                     if not user:
                         return jsonify({'error': 'Authentication required'}), 401
 
-                    permissions = user.get('permissions', [])
-                    if permission not in permissions and 'admin' not in permissions:
-                        return jsonify({'error': f'Permission denied: {permission} required'}), 403
+                    if not self._perm_mask(user) & required_mask:
+                        return jsonify(denied), 403
 
                     g.current_user = user
                     return f(*args, **kwargs)
@@ -314,11 +661,11 @@ class AuthMiddleware:
 
     def optional_auth(self, f: Callable) -> Callable:
         """Decorator for optional authentication (user info available if provided)"""
+        if not self.config.enabled:
+            return f
+
         @wraps(f)
         def decorated(*args, **kwargs):
-            if not self.config.enabled:
-                return f(*args, **kwargs)
-
             try:
                 user = self.provider.authenticate(request)
                 g.current_user = user  # May be None
@@ -348,6 +695,9 @@ def log_action(user_id: str, action: str, details: Dict[str, Any] = None):
         user_id: The ID of the user performing the action
         action: The action being performed
         details: Additional details about the action
+
+    Returns:
+        The logged entry
     """
     log_entry = {
         'timestamp': datetime.utcnow().isoformat(),
@@ -358,6 +708,7 @@ def log_action(user_id: str, action: str, details: Dict[str, Any] = None):
         'user_agent': request.headers.get('User-Agent') if request else None
     }
 
-    logger.info(f"AUDIT: {json.dumps(log_entry)}")
+    # Serialized only if a handler actually formats the record
+    logger.info("AUDIT: %s", _LazyJSON(log_entry))
 
     return log_entry
@@ -0,0 +1,49 @@
+"""
+In-Process Caching for Curriculum Mapping Service
+
+Small thread-safe LRU/TTL cache shared by the auth providers (credential
+lookups) and HybridStorageManager (mapping set reads). Each gunicorn worker
+holds its own copy; entries expire after ``ttl`` seconds, which bounds how
+long a worker can serve a value another worker has changed.
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe LRU cache of at most ``maxsize`` entries, each valid for ``ttl`` seconds"""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (expiry on the monotonic clock, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[0]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
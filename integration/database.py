@@ -6,22 +6,241 @@ Supports PostgreSQL, MySQL, SQLite, and other SQL databases.
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from contextlib import contextmanager, nullcontext
+from operator import attrgetter, itemgetter
+from typing import Optional, List, Dict, Any, Iterator
+import atexit
+import io
 import json
 import logging
+import os
+import queue
+import threading
+import time
+
+from .cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 # SQLAlchemy imports (optional dependency)
 try:
-    from sqlalchemy import create_engine, Column, String, Integer, Float, Text, DateTime, Boolean, ForeignKey, JSON
+    from sqlalchemy import create_engine, event, text, select, insert, update, lambda_stmt, tuple_, Index, Column, String, Uuid, Integer, Float, Text, DateTime, Boolean, ForeignKey, JSON
     from sqlalchemy.ext.declarative import declarative_base
-    from sqlalchemy.orm import sessionmaker, relationship, scoped_session
+    from sqlalchemy.orm import sessionmaker, relationship
+    from sqlalchemy.dialects.postgresql import JSONB
     SQLALCHEMY_AVAILABLE = True
 except ImportError:
     SQLALCHEMY_AVAILABLE = False
     logger.warning("SQLAlchemy not installed. Database features disabled. Install with: pip install sqlalchemy")
 
+# orjson (optional dependency): faster encoding/decoding of JSON columns
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Mapping sets with more rows than this are inserted with bulk_insert_mappings
+# (executemany, no ORM unit-of-work); smaller ones keep ORM instances and events
+BULK_INSERT_THRESHOLD = 50
+
+# On PostgreSQL (psycopg2), sets of at least this many rows are streamed with COPY
+COPY_THRESHOLD = 500
+
+MAPPING_COPY_COLUMNS = (
+    'id', 'mapping_set_id', 'question_number', 'question_text', 'mapped_id',
+    'mapped_topic', 'mapped_subtopic', 'confidence', 'justification', 'rating',
+    'agreement_score', 'status', 'created_at'
+)
+
+# Applied to every new SQLite connection: WAL lets readers run alongside the
+# (single) writer, busy_timeout waits for the write lock instead of failing
+# with "database is locked"
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+)
+
+# Monthly audit log partitions created ahead of time on PostgreSQL
+AUDIT_PARTITION_MONTHS_AHEAD = 3
+
+# question_count is maintained by triggers on curriculum_mappings, so it stays
+# right when mappings are added or deleted after the set is saved.
+# PostgreSQL: statement-level triggers with transition tables (one UPDATE per
+# INSERT/COPY statement, not per row); SQLite: row-level triggers.
+_PG_COUNT_TRIGGER_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION curriculum_mapping_count() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE curriculum_mapping_sets s SET question_count = s.question_count + n.c
+            FROM (SELECT mapping_set_id, count(*) AS c FROM new_rows GROUP BY mapping_set_id) n
+            WHERE s.id = n.mapping_set_id;
+        ELSE
+            UPDATE curriculum_mapping_sets s SET question_count = s.question_count - o.c
+            FROM (SELECT mapping_set_id, count(*) AS c FROM old_rows GROUP BY mapping_set_id) o
+            WHERE s.id = o.mapping_set_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS curriculum_mappings_count_ins ON curriculum_mappings",
+    """
+    CREATE TRIGGER curriculum_mappings_count_ins AFTER INSERT ON curriculum_mappings
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT
+    EXECUTE FUNCTION curriculum_mapping_count()
+    """,
+    "DROP TRIGGER IF EXISTS curriculum_mappings_count_del ON curriculum_mappings",
+    """
+    CREATE TRIGGER curriculum_mappings_count_del AFTER DELETE ON curriculum_mappings
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT
+    EXECUTE FUNCTION curriculum_mapping_count()
+    """,
+)
+_SQLITE_COUNT_TRIGGER_DDL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS curriculum_mappings_count_ins
+    AFTER INSERT ON curriculum_mappings BEGIN
+        UPDATE curriculum_mapping_sets SET question_count = question_count + 1
+        WHERE id = NEW.mapping_set_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS curriculum_mappings_count_del
+    AFTER DELETE ON curriculum_mappings BEGIN
+        UPDATE curriculum_mapping_sets SET question_count = question_count - 1
+        WHERE id = OLD.mapping_set_id;
+    END
+    """,
+)
+
+# HybridStorageManager stops trying the database for DB_COOLDOWN_SECONDS
+# after this many consecutive failures
+DB_FAILURE_THRESHOLD = 5
+DB_COOLDOWN_SECONDS = 30
+
+# Mapping set listings fetch rows from the cursor in chunks of this size
+LIST_YIELD_PER = 200
+
+# Audit events are queued and written by a background thread in batches of
+# up to AUDIT_BATCH_SIZE rows, at most AUDIT_FLUSH_INTERVAL seconds apart
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL = 0.2
+
+# COPY text format: backslash escapes for the field/row separators, \N for NULL
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _make_psycopg2_cooperative() -> bool:
+    """
+    Under gevent workers (see gunicorn.conf.py), let psycopg2 wait on the
+    gevent hub instead of blocking the whole worker during queries.
+
+    Returns:
+        True if psycopg2 was patched
+    """
+    try:
+        from gevent import monkey
+        if not monkey.is_module_patched('socket'):
+            return False
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        return False
+
+    patch_psycopg()
+    return True
+
+
+# Columns returned by MappingSet.to_dict / Mapping.to_dict / get_audit_logs.
+# Summary listings and audit queries select just these columns (plain rows,
+# no ORM instances) and build the dicts from them.
+MAPPING_SET_FIELDS = (
+    'id', 'user_id', 'name', 'dimension', 'mode', 'source_file',
+    'question_count', 'created_at', 'updated_at'
+)
+MAPPING_FIELDS = (
+    'id', 'question_number', 'question_text', 'mapped_id', 'mapped_topic',
+    'mapped_subtopic', 'confidence', 'justification', 'rating',
+    'agreement_score', 'status'
+)
+AUDIT_LOG_FIELDS = (
+    'id', 'user_id', 'action', 'resource_type', 'resource_id', 'details',
+    'ip_address', 'created_at'
+)
+
+_mapping_set_values = attrgetter(*MAPPING_SET_FIELDS)
+_mapping_values = attrgetter(*MAPPING_FIELDS)
+_mapping_set_items = itemgetter(*MAPPING_SET_FIELDS)
+
+
+def _mapping_set_dict(values) -> Dict[str, Any]:
+    """Summary dict from MAPPING_SET_FIELDS values (a row or attrgetter tuple)"""
+    result = dict(zip(MAPPING_SET_FIELDS, values))
+    created_at, updated_at = values[7], values[8]
+    result['created_at'] = created_at.isoformat() if created_at else None
+    result['updated_at'] = updated_at.isoformat() if updated_at else None
+    return result
+
+
+def _mapping_dict(values) -> Dict[str, Any]:
+    """Recommendation dict from MAPPING_FIELDS values"""
+    (mapping_id, question_number, question_text, mapped_id, mapped_topic,
+     mapped_subtopic, confidence, justification, rating, agreement_score, status) = values
+    return {
+        'id': mapping_id,
+        'question_num': question_number,
+        'question_text': question_text,
+        'mapped_id': mapped_id,
+        'mapped_topic': mapped_topic,
+        'mapped_subtopic': mapped_subtopic,
+        'recommended_mapping': mapped_id or f"{mapped_topic} / {mapped_subtopic}",
+        'confidence': confidence,
+        'justification': justification,
+        'rating': rating,
+        'agreement_score': agreement_score,
+        'status': status
+    }
+
+
+def _audit_log_dict(values) -> Dict[str, Any]:
+    """Audit entry dict from AUDIT_LOG_FIELDS values"""
+    result = dict(zip(AUDIT_LOG_FIELDS, values))
+    created_at = values[7]
+    result['created_at'] = created_at.isoformat() if created_at else None
+    return result
+
+
+def _json_serializer(obj) -> str:
+    """Encode JSON column values with orjson, the standard library as fallback"""
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+    except orjson.JSONEncodeError:
+        return json.dumps(obj)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Engine 'connect' hook: apply SQLITE_PRAGMAS to a new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _copy_field(value) -> str:
+    """Format one value for PostgreSQL's COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).translate(_COPY_ESCAPES)
+
+
 if SQLALCHEMY_AVAILABLE:
     Base = declarative_base()
 
@@ -32,9 +251,16 @@ if SQLALCHEMY_AVAILABLE:
         Corresponds to the library JSON files in the file-based storage.
         """
         __tablename__ = 'curriculum_mapping_sets'
-
+        __table_args__ = (
+            # list_mapping_sets: filter by user or dimension, newest first
+            Index('ix_mset_user_created', 'user_id', 'created_at'),
+            Index('ix_mset_dim_created', 'dimension', 'created_at'),
+        )
+
+        # String, not Uuid: sets migrated from the file library keep their
+        # 8-character library IDs; new sets get a full UUID
         id = Column(String(36), primary_key=True)
-        user_id = Column(String(36), nullable=True, index=True)
+        user_id = Column(String(36), nullable=True)
         name = Column(String(255), nullable=False)
         dimension = Column(String(50), nullable=False)  # area_topics, competency, objective, skill, nmc_competency
         mode = Column(String(10), nullable=False)  # A (map), B (rate), C (insights)
@@ -47,20 +273,10 @@ if SQLALCHEMY_AVAILABLE:
         mappings = relationship("Mapping", back_populates="mapping_set", cascade="all, delete-orphan")
 
         def to_dict(self, include_mappings: bool = False) -> Dict[str, Any]:
-            result = {
-                'id': self.id,
-                'user_id': self.user_id,
-                'name': self.name,
-                'dimension': self.dimension,
-                'mode': self.mode,
-                'source_file': self.source_file,
-                'question_count': self.question_count,
-                'created_at': self.created_at.isoformat() if self.created_at else None,
-                'updated_at': self.updated_at.isoformat() if self.updated_at else None
-            }
+            result = _mapping_set_dict(_mapping_set_values(self))
 
             if include_mappings:
-                result['recommendations'] = [m.to_dict() for m in self.mappings]
+                result['recommendations'] = [_mapping_dict(_mapping_values(m)) for m in self.mappings]
 
             return result
 
@@ -71,7 +287,8 @@ if SQLALCHEMY_AVAILABLE:
         """
         __tablename__ = 'curriculum_mappings'
 
-        id = Column(String(36), primary_key=True)
+        # Native UUID on PostgreSQL, CHAR(32) elsewhere; values stay strings
+        id = Column(Uuid(as_uuid=False), primary_key=True)
         mapping_set_id = Column(String(36), ForeignKey('curriculum_mapping_sets.id'), nullable=False, index=True)
         question_number = Column(String(50))
         question_text = Column(Text)
@@ -95,37 +312,38 @@ if SQLALCHEMY_AVAILABLE:
         mapping_set = relationship("MappingSet", back_populates="mappings")
 
         def to_dict(self) -> Dict[str, Any]:
-            return {
-                'id': self.id,
-                'question_num': self.question_number,
-                'question_text': self.question_text,
-                'mapped_id': self.mapped_id,
-                'mapped_topic': self.mapped_topic,
-                'mapped_subtopic': self.mapped_subtopic,
-                'recommended_mapping': self.mapped_id or f"{self.mapped_topic} / {self.mapped_subtopic}",
-                'confidence': self.confidence,
-                'justification': self.justification,
-                'rating': self.rating,
-                'agreement_score': self.agreement_score,
-                'status': self.status
-            }
+            return _mapping_dict(_mapping_values(self))
 
 
     class AuditLog(Base):
         """
         Security audit log for tracking user actions.
+
+        On PostgreSQL the table is range-partitioned by month on created_at
+        (see DatabaseManager.ensure_audit_partitions), so time-bounded
+        queries only scan the matching months. The partition key has to be
+        part of the primary key there, hence (id, created_at).
         """
         __tablename__ = 'curriculum_audit_logs'
-
-        id = Column(String(36), primary_key=True)
-        user_id = Column(String(36), index=True)
+        __table_args__ = (
+            # get_audit_logs: filter by user (and action), time range, newest first
+            Index('ix_audit_user_action_time', 'user_id', 'action', 'created_at'),
+            {'postgresql_partition_by': 'RANGE (created_at)'},
+        )
+
+        id = Column(Uuid(as_uuid=False), primary_key=True)
+        user_id = Column(String(36))
         action = Column(String(100), nullable=False)
         resource_type = Column(String(50))
         resource_id = Column(String(36))
-        details = Column(JSON)
+        details = Column(JSON().with_variant(JSONB(), 'postgresql'))  # JSONB on PostgreSQL (indexable)
         ip_address = Column(String(45))
         user_agent = Column(String(255))
-        created_at = Column(DateTime, default=datetime.utcnow, index=True)
+        created_at = Column(DateTime, default=datetime.utcnow, primary_key=True, index=True)
+
+    MAPPING_SET_COLUMNS = tuple(getattr(MappingSet, f) for f in MAPPING_SET_FIELDS)
+    MAPPING_COLUMNS = (Mapping.mapping_set_id,) + tuple(getattr(Mapping, f) for f in MAPPING_FIELDS)
+    AUDIT_LOG_COLUMNS = tuple(getattr(AuditLog, f) for f in AUDIT_LOG_FIELDS)
 
 
 class DatabaseManager:
@@ -155,6 +373,15 @@ class DatabaseManager:
         self.config = config
         self.engine = None
         self.Session = None
+        self.supports_copy = False
+        self._write_lock = None  # SQLite only: serializes writers in this process
+        self.counts_in_db = False  # question_count maintained by triggers
+
+        # Background audit writer, started on first use in each process
+        self._audit_q = queue.SimpleQueue()
+        self._audit_lock = threading.Lock()
+        self._audit_thread = None
+        self._audit_pid = None
 
         if config.enabled and SQLALCHEMY_AVAILABLE:
             self._initialize_db()
@@ -166,15 +393,36 @@ class DatabaseManager:
                 self.config.url,
                 pool_size=self.config.pool_size,
                 max_overflow=self.config.max_overflow,
-                echo=False
+                echo=False,
+                **self._engine_options()
             )
 
+            # COPY fast path needs psycopg2's copy_expert
+            self.supports_copy = (self.engine.dialect.name == 'postgresql' and
+                                  self.engine.dialect.driver == 'psycopg2')
+
+            # Concurrent requests in a gevent worker overlap their DB round trips
+            if self.engine.dialect.driver == 'psycopg2' and _make_psycopg2_cooperative():
+                logger.info("psycopg2 patched for gevent (psycogreen)")
+
+            if self.engine.dialect.name == 'sqlite':
+                event.listen(self.engine, 'connect', _apply_sqlite_pragmas)
+                self._write_lock = threading.Lock()
+
             # Create tables if they don't exist
             Base.metadata.create_all(self.engine)
 
-            # Create session factory
-            session_factory = sessionmaker(bind=self.engine)
-            self.Session = scoped_session(session_factory)
+            if self.engine.dialect.name == 'postgresql':
+                self.ensure_audit_partitions()
+
+            self.counts_in_db = self._install_count_triggers()
+
+            # Session factory; every operation opens its own session with
+            # ``with self.session_scope()`` (writes) or ``with self.Session()``
+            # (reads), which commits/rolls back and returns the connection to
+            # the pool on exit. expire_on_commit=False keeps committed objects
+            # readable for to_dict() after the block.
+            self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
 
             logger.info("Database initialized successfully")
 
@@ -182,17 +430,103 @@ class DatabaseManager:
             logger.error(f"Failed to initialize database: {e}")
             raise
 
+    def _install_count_triggers(self) -> bool:
+        """
+        Create the question_count triggers (PostgreSQL 11+ and SQLite).
+
+        Returns:
+            True if the database now maintains question_count; False means
+            it is set from the payload at save time, as on other backends
+        """
+        dialect = self.engine.dialect.name
+        if dialect == 'postgresql':
+            statements = _PG_COUNT_TRIGGER_DDL
+        elif dialect == 'sqlite':
+            statements = _SQLITE_COUNT_TRIGGER_DDL
+        else:
+            return False
+
+        try:
+            with self.engine.begin() as conn:
+                if dialect == 'postgresql':
+                    # Workers start together; only one replaces the triggers at a time
+                    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('curriculum_mapping_count'))"))
+                for statement in statements:
+                    conn.exec_driver_sql(statement)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not install question_count triggers, counting at save time: {e}")
+            return False
+
+    def _engine_options(self) -> Dict[str, Any]:
+        """
+        Pool and driver options for the configured backend.
+
+        pool_pre_ping replaces connections the server closed while idle
+        (instead of failing the request with OperationalError), pool_recycle
+        retires them before server-side timeouts, and LIFO reuse keeps the
+        most recently used (warm) connections busy so idle ones can expire.
+        JSON columns are encoded/decoded with orjson when it is installed.
+        """
+        options = {
+            'pool_pre_ping': True,
+            'pool_recycle': self.config.pool_recycle,
+            'pool_use_lifo': True
+        }
+        if ORJSON_AVAILABLE:
+            options['json_serializer'] = _json_serializer
+            options['json_deserializer'] = orjson.loads
+
+        backend = self.config.url.split(':', 1)[0].split('+', 1)[0]
+        if backend == 'postgresql':
+            options['isolation_level'] = 'READ COMMITTED'
+            options['connect_args'] = {
+                'connect_timeout': self.config.connect_timeout,
+                'application_name': 'curriculum-mapper'
+            }
+        elif backend == 'mysql':
+            options['connect_args'] = {'connect_timeout': self.config.connect_timeout}
+
+        return options
+
+    @contextmanager
+    def session_scope(self):
+        """
+        Transactional scope for a unit of work.
+
+        Yields a new session that commits when the block exits normally,
+        rolls back on an exception and is always closed. Sessions are never
+        shared: each call (thread, greenlet or task) gets its own, so no
+        state carries over between requests.
+
+        On SQLite, writers in this process also take a lock first, so they
+        queue here instead of contending for the database file lock; plain
+        reads (``with db.get_session()``) do not take it and proceed
+        concurrently under WAL.
+
+        Usage:
+            with db.session_scope() as session:
+                session.add(...)
+        """
+        if not self.Session:
+            raise RuntimeError("Database not initialized")
+
+        with self._write_lock or nullcontext():
+            with self.Session.begin() as session:
+                yield session
+
     def get_session(self):
-        """Get a database session"""
+        """
+        Get a new database session.
+
+        The caller owns it; use it as a context manager
+        (``with db.get_session() as session:``) so it is always closed, or
+        use session_scope() to get commit/rollback handling as well.
+        """
         if not self.Session:
             raise RuntimeError("Database not initialized")
         return self.Session()
 
-    def close_session(self):
-        """Close the current session"""
-        if self.Session:
-            self.Session.remove()
-
     # ==========================================
     # Mapping Set Operations
     # ==========================================
@@ -208,88 +542,251 @@ class DatabaseManager:
         Returns:
             Saved mapping set data
         """
-        import uuid
+        try:
+            values, rows = self._mapping_set_rows(data, user_id)
+
+            with self.session_scope() as session:
+                # Parent row as a Core INSERT, executed immediately so the
+                # mappings below can reference it. With RETURNING the stored
+                # row (including defaulted timestamps) comes back from the
+                # same round trip and no ORM instance is built or refreshed.
+                stmt = insert(MappingSet).values(**self._parent_row(values))
+                if self.engine.dialect.insert_returning:
+                    saved = _mapping_set_dict(session.execute(stmt.returning(*MAPPING_SET_COLUMNS)).one())
+                    # RETURNING ran before the mappings were counted in
+                    saved['question_count'] = values['question_count']
+                else:
+                    session.execute(stmt)
+                    saved = None
+
+                self._insert_mappings(session, rows)
+
+            return saved or self.get_mapping_set(values['id'], include_mappings=False)
 
-        session = self.get_session()
+        except Exception as e:
+            logger.error(f"Failed to save mapping set: {e}")
+            raise
 
-        try:
-            mapping_set_id = data.get('id') or str(uuid.uuid4())[:8]
-
-            mapping_set = MappingSet(
-                id=mapping_set_id,
-                user_id=user_id,
-                name=data.get('name', f'Mapping_{datetime.now().strftime("%Y%m%d_%H%M%S")}'),
-                dimension=data.get('dimension', 'area_topics'),
-                mode=data.get('mode', 'A'),
-                source_file=data.get('source_file', ''),
-                question_count=len(data.get('recommendations', []))
-            )
+    def save_mapping_sets(self, batch: List[Dict[str, Any]], user_id: str = None) -> List[Dict[str, Any]]:
+        """
+        Save several mapping sets in one transaction.
 
-            session.add(mapping_set)
-
-            # Add individual mappings
-            for idx, rec in enumerate(data.get('recommendations', [])):
-                mapping = Mapping(
-                    id=str(uuid.uuid4()),
-                    mapping_set_id=mapping_set_id,
-                    question_number=rec.get('question_num', f'Q{idx+1}'),
-                    question_text=rec.get('question_text', ''),
-                    mapped_id=rec.get('mapped_id', ''),
-                    mapped_topic=rec.get('mapped_topic', ''),
-                    mapped_subtopic=rec.get('mapped_subtopic', ''),
-                    confidence=rec.get('confidence', 0.0),
-                    justification=rec.get('justification', ''),
-                    rating=rec.get('rating'),
-                    agreement_score=rec.get('agreement_score'),
-                    status='pending'
-                )
-                session.add(mapping)
+        All parent rows go in one executemany and all mappings in one bulk
+        insert (or COPY), with a single commit, instead of one transaction
+        per set. Either every set is saved or none is.
+
+        Args:
+            batch: Mapping set payloads (same format as save_mapping_set)
+            user_id: Optional user ID for ownership of every set
+
+        Returns:
+            Saved mapping set summaries, in the order given
+        """
+        if not batch:
+            return []
+
+        try:
+            now = datetime.utcnow()
+            parents, children = [], []
+            for data in batch:
+                values, rows = self._mapping_set_rows(data, user_id)
+                values['created_at'] = values['updated_at'] = now
+                parents.append(values)
+                children.extend(rows)
 
-            session.commit()
+            with self.session_scope() as session:
+                session.execute(insert(MappingSet), [self._parent_row(values) for values in parents])
+                self._insert_mappings(session, children)
 
-            return mapping_set.to_dict()
+            return [_mapping_set_dict(_mapping_set_items(values)) for values in parents]
 
         except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to save mapping set: {e}")
+            logger.error(f"Failed to save {len(batch)} mapping set(s): {e}")
             raise
 
+    @staticmethod
+    def _mapping_set_rows(data: Dict[str, Any], user_id: str = None):
+        """
+        Column values for a mapping set payload.
+
+        Returns:
+            (mapping set row dict, list of mapping row dicts)
+        """
+        import uuid
+
+        mapping_set_id = data.get('id') or str(uuid.uuid4())
+        recommendations = data.get('recommendations', [])
+
+        values = {
+            'id': mapping_set_id,
+            'user_id': user_id,
+            'name': data.get('name', f'Mapping_{datetime.now().strftime("%Y%m%d_%H%M%S")}'),
+            'dimension': data.get('dimension', 'area_topics'),
+            'mode': data.get('mode', 'A'),
+            'source_file': data.get('source_file', ''),
+            'question_count': len(recommendations)
+        }
+
+        # Individual mappings as plain row dicts
+        rows = [{
+            'id': str(uuid.uuid4()),
+            'mapping_set_id': mapping_set_id,
+            'question_number': rec.get('question_num', f'Q{idx+1}'),
+            'question_text': rec.get('question_text', ''),
+            'mapped_id': rec.get('mapped_id', ''),
+            'mapped_topic': rec.get('mapped_topic', ''),
+            'mapped_subtopic': rec.get('mapped_subtopic', ''),
+            'confidence': rec.get('confidence', 0.0),
+            'justification': rec.get('justification', ''),
+            'rating': rec.get('rating'),
+            'agreement_score': rec.get('agreement_score'),
+            'status': 'pending'
+        } for idx, rec in enumerate(recommendations)]
+
+        return values, rows
+
+    def _parent_row(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Mapping set row to insert; with count triggers it starts at 0 and the mappings add to it"""
+        if self.counts_in_db:
+            return {**values, 'question_count': 0}
+        return values
+
+    def _insert_mappings(self, session, rows: List[Dict[str, Any]]):
+        """Insert mapping rows by the cheapest path for their count"""
+        if self.supports_copy and len(rows) >= COPY_THRESHOLD:
+            self._copy_mappings(session, rows)
+        elif len(rows) > BULK_INSERT_THRESHOLD:
+            # One executemany, no per-row ORM bookkeeping
+            session.bulk_insert_mappings(Mapping, rows)
+        else:
+            session.add_all(Mapping(**row) for row in rows)
+
+    def _copy_mappings(self, session, rows: List[Dict[str, Any]]):
+        """
+        Stream mapping rows into curriculum_mappings with a single COPY.
+
+        Runs on the session's own connection, so it commits or rolls back
+        with the rest of the transaction.
+        """
+        created_at = datetime.utcnow()
+        buffer = io.StringIO()
+        for row in rows:
+            row['created_at'] = created_at
+            buffer.write('\t'.join(_copy_field(row[col]) for col in MAPPING_COPY_COLUMNS))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        cursor = session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {Mapping.__tablename__} ({', '.join(MAPPING_COPY_COLUMNS)}) FROM STDIN",
+                buffer
+            )
         finally:
-            self.close_session()
+            cursor.close()
 
     def list_mapping_sets(self, user_id: str = None, dimension: str = None,
-                          limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+                          limit: int = 100, offset: int = 0,
+                          include_mappings: bool = False,
+                          before: tuple = None) -> List[Dict[str, Any]]:
         """
-        List mapping sets with optional filtering.
+        List mapping sets with optional filtering, newest first.
 
         Args:
             user_id: Filter by user
             dimension: Filter by dimension
             limit: Max results
-            offset: Pagination offset
+            offset: Pagination offset (prefer ``before``: OFFSET scans and
+                discards every skipped row)
+            include_mappings: Whether to include individual mappings (loaded
+                for all sets in one extra query)
+            before: Keyset cursor ``(created_at, id)`` of the last set on the
+                previous page; only older sets are returned
 
         Returns:
             List of mapping set summaries
         """
-        session = self.get_session()
+        return list(self.iter_mapping_sets(user_id=user_id, dimension=dimension,
+                                           limit=limit, offset=offset,
+                                           include_mappings=include_mappings,
+                                           before=before))
+
+    def iter_mapping_sets(self, user_id: str = None, dimension: str = None,
+                          limit: int = 100, offset: int = 0,
+                          include_mappings: bool = False,
+                          before: tuple = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream mapping sets, newest first (same arguments as list_mapping_sets).
 
-        try:
-            query = session.query(MappingSet)
+        Rows are fetched LIST_YIELD_PER at a time (server-side cursor where the
+        driver supports one), and with include_mappings each chunk loads its
+        own mappings, so large listings never hold every set in memory. The
+        session stays open until the generator is exhausted or closed; wrap
+        it in ``stream_with_context`` when streaming a Flask response.
+
+        Yields:
+            Mapping set dicts, as in list_mapping_sets
+        """
+        with self.Session() as session:
+            # lambda_stmt: each combination of filters is built and compiled
+            # once; later calls only swap in the new parameter values.
+            # Plain column rows, no ORM instances.
+            stmt = lambda_stmt(lambda: select(*MAPPING_SET_COLUMNS))
 
             if user_id:
-                query = query.filter(MappingSet.user_id == user_id)
+                stmt += lambda s: s.where(MappingSet.user_id == user_id)
             if dimension:
-                query = query.filter(MappingSet.dimension == dimension)
-
-            query = query.order_by(MappingSet.created_at.desc())
-            query = query.offset(offset).limit(limit)
-
-            results = query.all()
+                stmt += lambda s: s.where(MappingSet.dimension == dimension)
+
+            if before:
+                created_at, set_id = before
+                if isinstance(created_at, str):
+                    created_at = datetime.fromisoformat(created_at)
+                stmt += lambda s: s.where(tuple_(MappingSet.created_at, MappingSet.id) < tuple_(created_at, set_id))
+
+            stmt += lambda s: s.order_by(MappingSet.created_at.desc(), MappingSet.id.desc())
+            if offset and not before:
+                stmt += lambda s: s.offset(offset)
+            stmt += lambda s: s.limit(limit)
+
+            result = session.execute(stmt, execution_options={'yield_per': LIST_YIELD_PER})
+
+            for rows in result.partitions():
+                sets = [_mapping_set_dict(row) for row in rows]
+                if include_mappings:
+                    self._attach_mappings(session, sets)
+                yield from sets
+
+    def _attach_mappings(self, session, sets: List[Dict[str, Any]]):
+        """Add 'recommendations' to mapping set dicts, with one query for all of them"""
+        by_id = {}
+        for mapping_set in sets:
+            mapping_set['recommendations'] = []
+            by_id[mapping_set['id']] = mapping_set['recommendations']
+
+        set_ids = list(by_id)
+        rows = session.execute(lambda_stmt(
+            lambda: select(*MAPPING_COLUMNS).where(Mapping.mapping_set_id.in_(set_ids))
+        ))
+        for row in rows:
+            by_id[row[0]].append(_mapping_dict(row[1:]))
+
+    def page_mapping_sets(self, user_id: str = None, dimension: str = None,
+                          before: tuple = None, limit: int = 100) -> Dict[str, Any]:
+        """
+        One page of mapping sets using keyset pagination.
 
-            return [ms.to_dict() for ms in results]
+        Returns:
+            {'items': [...], 'next_cursor': (created_at_iso, id) or None};
+            pass next_cursor as ``before`` to fetch the following page
+        """
+        items = self.list_mapping_sets(user_id=user_id, dimension=dimension,
+                                       limit=limit, before=before)
+        next_cursor = None
+        if len(items) == limit and items[-1]['created_at']:
+            next_cursor = (items[-1]['created_at'], items[-1]['id'])
 
-        finally:
-            self.close_session()
+        return {'items': items, 'next_cursor': next_cursor}
 
     def get_mapping_set(self, mapping_set_id: str, include_mappings: bool = True) -> Optional[Dict[str, Any]]:
         """
@@ -302,18 +799,18 @@ class DatabaseManager:
         Returns:
             Mapping set data or None if not found
         """
-        session = self.get_session()
+        with self.Session() as session:
+            row = session.execute(lambda_stmt(
+                lambda: select(*MAPPING_SET_COLUMNS).where(MappingSet.id == mapping_set_id)
+            )).first()
 
-        try:
-            mapping_set = session.query(MappingSet).filter(MappingSet.id == mapping_set_id).first()
-
-            if not mapping_set:
+            if not row:
                 return None
 
-            return mapping_set.to_dict(include_mappings=include_mappings)
-
-        finally:
-            self.close_session()
+            mapping_set = _mapping_set_dict(row)
+            if include_mappings:
+                self._attach_mappings(session, [mapping_set])
+            return mapping_set
 
     def delete_mapping_set(self, mapping_set_id: str) -> bool:
         """
@@ -325,27 +822,21 @@ class DatabaseManager:
         Returns:
             True if deleted, False if not found
         """
-        session = self.get_session()
-
         try:
-            mapping_set = session.query(MappingSet).filter(MappingSet.id == mapping_set_id).first()
+            with self.session_scope() as session:
+                mapping_set = session.query(MappingSet).filter(MappingSet.id == mapping_set_id).first()
 
-            if not mapping_set:
-                return False
+                if not mapping_set:
+                    return False
 
-            session.delete(mapping_set)
-            session.commit()
+                session.delete(mapping_set)
 
             return True
 
         except Exception as e:
-            session.rollback()
             logger.error(f"Failed to delete mapping set: {e}")
             raise
 
-        finally:
-            self.close_session()
-
     def update_mapping_status(self, mapping_id: str, status: str) -> bool:
         """
         Update the status of an individual mapping.
@@ -357,27 +848,37 @@ class DatabaseManager:
         Returns:
             True if updated, False if not found
         """
-        session = self.get_session()
+        return self.update_mapping_statuses([mapping_id], status) > 0
 
-        try:
-            mapping = session.query(Mapping).filter(Mapping.id == mapping_id).first()
+    def update_mapping_statuses(self, mapping_ids: List[str], status: str) -> int:
+        """
+        Set the status of many mappings with a single UPDATE ... WHERE id IN (...).
 
-            if not mapping:
-                return False
+        Args:
+            mapping_ids: The mapping IDs (e.g. all rows accepted in one review)
+            status: New status (pending, accepted, rejected)
 
-            mapping.status = status
-            session.commit()
+        Returns:
+            Number of mappings updated
+        """
+        if not mapping_ids:
+            return 0
 
-            return True
+        try:
+            with self.session_scope() as session:
+                result = session.execute(
+                    lambda_stmt(lambda: update(Mapping)
+                                .where(Mapping.id.in_(mapping_ids))
+                                .values(status=status)),
+                    execution_options={'synchronize_session': False}
+                )
+
+            return result.rowcount
 
         except Exception as e:
-            session.rollback()
             logger.error(f"Failed to update mapping status: {e}")
             raise
 
-        finally:
-            self.close_session()
-
     # ==========================================
     # Audit Log Operations
     # ==========================================
@@ -387,32 +888,144 @@ class DatabaseManager:
                    ip_address: str = None, user_agent: str = None):
         """
         Log an action for audit purposes.
+
+        Non-blocking: the entry is queued and written with other pending
+        entries by a background thread (see flush_audit).
         """
         import uuid
 
-        session = self.get_session()
+        self._audit_q.put({
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'action': action,
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'details': details,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'created_at': datetime.utcnow()
+        })
+        self._ensure_audit_writer()
+
+    def flush_audit(self, timeout: float = 5.0):
+        """
+        Write all queued audit entries now.
 
-        try:
-            log = AuditLog(
-                id=str(uuid.uuid4()),
-                user_id=user_id,
-                action=action,
-                resource_type=resource_type,
-                resource_id=resource_id,
-                details=details,
-                ip_address=ip_address,
-                user_agent=user_agent
+        Call before shutdown (also registered with atexit) or when a reader
+        needs entries that were just logged.
+
+        Args:
+            timeout: Max seconds to wait for the background writer
+        """
+        if self._audit_thread is not None and self._audit_thread.is_alive() \
+                and self._audit_pid == os.getpid():
+            done = threading.Event()
+            self._audit_q.put(done)
+            done.wait(timeout)
+            return
+
+        batch = []
+        while True:
+            try:
+                item = self._audit_q.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, dict):
+                batch.append(item)
+            else:
+                item.set()
+        self._write_audit(batch)
+
+    def _ensure_audit_writer(self):
+        """Start the audit writer thread (again after a fork)."""
+        if self._audit_pid == os.getpid():
+            return
+
+        with self._audit_lock:
+            if self._audit_pid == os.getpid():
+                return
+            if self._audit_pid is None:
+                atexit.register(self.flush_audit)
+            self._audit_thread = threading.Thread(
+                target=self._audit_writer, name='audit-writer', daemon=True
             )
+            self._audit_thread.start()
+            self._audit_pid = os.getpid()
+
+    def _audit_writer(self):
+        """Drain the audit queue: up to AUDIT_BATCH_SIZE rows or AUDIT_FLUSH_INTERVAL per write."""
+        while True:
+            batch, waiters = [], []
+            item = self._audit_q.get()
+            deadline = time.monotonic() + AUDIT_FLUSH_INTERVAL
+
+            while True:
+                if isinstance(item, dict):
+                    batch.append(item)
+                else:
+                    waiters.append(item)
+                    break  # flush_audit() is waiting; write what we have now
+
+                remaining = deadline - time.monotonic()
+                if len(batch) >= AUDIT_BATCH_SIZE or remaining <= 0:
+                    break
+                try:
+                    item = self._audit_q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            self._write_audit(batch)
+            for done in waiters:
+                done.set()
+
+    def _write_audit(self, rows: List[Dict[str, Any]]):
+        """Insert a batch of audit rows in one transaction."""
+        if not rows or not self.Session:
+            return
 
-            session.add(log)
-            session.commit()
+        try:
+            with self.session_scope() as session:
+                session.bulk_insert_mappings(AuditLog, rows)
 
         except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to log action: {e}")
+            logger.error(f"Failed to log {len(rows)} action(s): {e}")
 
-        finally:
-            self.close_session()
+    def ensure_audit_partitions(self, months_ahead: int = AUDIT_PARTITION_MONTHS_AHEAD):
+        """
+        Create the monthly audit log partitions (PostgreSQL only).
+
+        Creates partitions for the current month and the next
+        ``months_ahead`` months, plus a DEFAULT partition that catches rows
+        outside them. Runs at startup; call it from a monthly scheduled job
+        (or manage partitions with pg_partman) so long-running deployments
+        always have next month's partition before it starts.
+
+        Args:
+            months_ahead: Number of future months to create
+        """
+        if not self.engine or self.engine.dialect.name != 'postgresql':
+            return
+
+        table = AuditLog.__tablename__
+        today = datetime.utcnow()
+        year, month = today.year, today.month
+
+        statements = [f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"]
+        for _ in range(months_ahead + 1):
+            next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+            statements.append(
+                f"CREATE TABLE IF NOT EXISTS {table}_{year:04d}_{month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{year:04d}-{month:02d}-01') TO ('{next_year:04d}-{next_month:02d}-01')"
+            )
+            year, month = next_year, next_month
+
+        try:
+            with self.engine.begin() as conn:
+                for statement in statements:
+                    conn.exec_driver_sql(statement)
+        except Exception as e:
+            # e.g. a table created before partitioning was introduced
+            logger.warning(f"Could not create audit log partitions: {e}")
 
     def get_audit_logs(self, user_id: str = None, action: str = None,
                        start_date: datetime = None, end_date: datetime = None,
@@ -420,38 +1033,23 @@ class DatabaseManager:
         """
         Query audit logs.
         """
-        session = self.get_session()
+        self.flush_audit()
 
-        try:
-            query = session.query(AuditLog)
+        with self.Session() as session:
+            stmt = lambda_stmt(lambda: select(*AUDIT_LOG_COLUMNS))
 
             if user_id:
-                query = query.filter(AuditLog.user_id == user_id)
+                stmt += lambda s: s.where(AuditLog.user_id == user_id)
             if action:
-                query = query.filter(AuditLog.action == action)
+                stmt += lambda s: s.where(AuditLog.action == action)
             if start_date:
-                query = query.filter(AuditLog.created_at >= start_date)
+                stmt += lambda s: s.where(AuditLog.created_at >= start_date)
             if end_date:
-                query = query.filter(AuditLog.created_at <= end_date)
+                stmt += lambda s: s.where(AuditLog.created_at <= end_date)
 
-            query = query.order_by(AuditLog.created_at.desc())
-            query = query.limit(limit)
+            stmt += lambda s: s.order_by(AuditLog.created_at.desc()).limit(limit)
 
-            results = query.all()
-
-            return [{
-                'id': log.id,
-                'user_id': log.user_id,
-                'action': log.action,
-                'resource_type': log.resource_type,
-                'resource_id': log.resource_id,
-                'details': log.details,
-                'ip_address': log.ip_address,
-                'created_at': log.created_at.isoformat() if log.created_at else None
-            } for log in results]
-
-        finally:
-            self.close_session()
+            return [_audit_log_dict(row) for row in session.execute(stmt)]
 
 
 # ==========================================
@@ -464,17 +1062,46 @@ class HybridStorageManager:
 
     Uses database when available, falls back to file-based storage.
     Useful during migration or for platforms that want both options.
+
+    Saved mapping sets do not change, so get_mapping results are kept in a
+    per-process LRU cache (invalidated by save_mapping/delete_mapping here;
+    changes made elsewhere show up once the entry's TTL expires). Cached
+    dicts are shared between callers and must not be modified.
+
+    After DB_FAILURE_THRESHOLD consecutive database errors the database is
+    skipped for DB_COOLDOWN_SECONDS (circuit breaker), so requests go
+    straight to file storage instead of each waiting for a connect timeout.
     """
 
-    def __init__(self, database_manager: DatabaseManager = None, library_folder: str = None):
+    def __init__(self, database_manager: DatabaseManager = None, library_folder: str = None,
+                 cache_ttl: int = 60, cache_size: int = 512):
         self.db = database_manager
         self.file_manager = None
+        self._get_cache = TTLCache(cache_ttl, cache_size)  # mapping_id -> mapping set
+        self._db_failures = 0
+        self._db_cooldown_until = 0.0
 
         if library_folder:
             # Import the file-based LibraryManager
             from .engine import LibraryManager
             self.file_manager = LibraryManager(library_folder)
 
+    def _db_available(self) -> bool:
+        """True if the database is configured and the circuit breaker is closed"""
+        if not (self.db and self.db.config.enabled):
+            return False
+        return time.monotonic() >= self._db_cooldown_until
+
+    def _db_failed(self):
+        self._db_failures += 1
+        if self._db_failures >= DB_FAILURE_THRESHOLD:
+            self._db_cooldown_until = time.monotonic() + DB_COOLDOWN_SECONDS
+            self._db_failures = 0
+            logger.warning(f"Database unavailable, using file storage for {DB_COOLDOWN_SECONDS}s")
+
+    def _db_succeeded(self):
+        self._db_failures = 0
+
     def save_mapping(self, name: str, recommendations: list, dimension: str,
                      mode: str, source_file: str = '', user_id: str = None) -> Dict[str, Any]:
         """Save mapping set (tries database first, falls back to file)"""
@@ -488,26 +1115,40 @@ class HybridStorageManager:
         }
 
         # Try database first
-        if self.db and self.db.config.enabled:
+        if self._db_available():
             try:
-                return self.db.save_mapping_set(data, user_id=user_id)
+                saved = self.db.save_mapping_set(data, user_id=user_id)
+                self._db_succeeded()
+                return self._invalidate(saved)
             except Exception as e:
+                self._db_failed()
                 logger.warning(f"Database save failed, falling back to file: {e}")
 
         # Fall back to file storage
         if self.file_manager:
-            return self.file_manager.save_mapping(name, recommendations, dimension, mode, source_file)
+            return self._invalidate(
+                self.file_manager.save_mapping(name, recommendations, dimension, mode, source_file)
+            )
 
         raise RuntimeError("No storage backend available")
 
+    def _invalidate(self, saved: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop any cached copy of a just-saved mapping set; returns ``saved``"""
+        if saved and saved.get('id'):
+            self._get_cache.pop(saved['id'])
+        return saved
+
     def list_mappings(self, user_id: str = None) -> List[Dict[str, Any]]:
         """List all mapping sets"""
 
         # Try database first
-        if self.db and self.db.config.enabled:
+        if self._db_available():
             try:
-                return self.db.list_mapping_sets(user_id=user_id)
+                sets = self.db.list_mapping_sets(user_id=user_id)
+                self._db_succeeded()
+                return sets
             except Exception as e:
+                self._db_failed()
                 logger.warning(f"Database list failed, falling back to file: {e}")
 
         # Fall back to file storage
@@ -518,12 +1159,25 @@ class HybridStorageManager:
 
     def get_mapping(self, mapping_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific mapping set"""
+        cached = self._get_cache.get(mapping_id)
+        if cached is not None:
+            return cached
+
+        mapping_set = self._load_mapping(mapping_id)
+        if mapping_set is not None:
+            self._get_cache.set(mapping_id, mapping_set)
+        return mapping_set
 
+    def _load_mapping(self, mapping_id: str) -> Optional[Dict[str, Any]]:
+        """Read a mapping set from the database, or from the library folder"""
         # Try database first
-        if self.db and self.db.config.enabled:
+        if self._db_available():
             try:
-                return self.db.get_mapping_set(mapping_id)
+                mapping_set = self.db.get_mapping_set(mapping_id)
+                self._db_succeeded()
+                return mapping_set
             except Exception as e:
+                self._db_failed()
                 logger.warning(f"Database get failed, falling back to file: {e}")
 
         # Fall back to file storage
@@ -534,12 +1188,16 @@ class HybridStorageManager:
 
     def delete_mapping(self, mapping_id: str) -> bool:
         """Delete a mapping set"""
+        self._get_cache.pop(mapping_id)
 
         # Try database first
-        if self.db and self.db.config.enabled:
+        if self._db_available():
             try:
-                return self.db.delete_mapping_set(mapping_id)
+                deleted = self.db.delete_mapping_set(mapping_id)
+                self._db_succeeded()
+                return deleted
             except Exception as e:
+                self._db_failed()
                 logger.warning(f"Database delete failed, falling back to file: {e}")
 
         # Fall back to file storage
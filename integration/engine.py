@@ -13,6 +13,8 @@ from datetime import datetime
 import os
 import uuid
 
+from .loaders import load_cached
+
 
 class AuditEngine:
     """
@@ -108,16 +110,8 @@ class AuditEngine:
         Returns:
             dict: Reference definitions keyed by topic/code
         """
-        # Handle both CSV and Excel files
-        if reference_csv.endswith('.csv'):
-            df = pd.read_csv(reference_csv)
-        elif reference_csv.endswith('.xlsx') or reference_csv.endswith('.xls'):
-            df = pd.read_excel(reference_csv, engine='openpyxl')
-        else:
-            try:
-                df = pd.read_csv(reference_csv)
-            except:
-                df = pd.read_excel(reference_csv, engine='openpyxl')
+        # Handle both CSV and Excel files (served from the Parquet cache when present)
+        df = load_cached(reference_csv)
 
         if dimension == 'area_topics':
             reference = {}
@@ -379,7 +373,7 @@ Rules:
         """
         import time
 
-        questions_df = pd.read_csv(question_csv)
+        questions_df = load_cached(question_csv)
         reference_data = self._load_reference_data(reference_csv, dimension)
 
         recommendations = []
@@ -459,7 +453,7 @@ Rules:
         """
         import time
 
-        questions_df = pd.read_csv(question_csv)
+        questions_df = load_cached(question_csv)
         reference_data = self._load_reference_data(reference_csv, dimension)
 
         recommendations = []
@@ -607,12 +601,7 @@ Rules:
         Returns:
             str: Path to output Excel file
         """
-        if question_csv.endswith('.csv'):
-            questions_df = pd.read_csv(question_csv)
-        elif question_csv.endswith('.ods'):
-            questions_df = pd.read_excel(question_csv, engine='odf')
-        else:
-            questions_df = pd.read_excel(question_csv, engine='openpyxl')
+        questions_df = load_cached(question_csv)
 
         for idx in selected_indices:
             if idx < len(recommendations):
@@ -752,13 +741,7 @@ Respond in JSON format:
         """
         import time
 
-        if mapped_file.endswith('.csv'):
-            mapped_df = pd.read_csv(mapped_file)
-        else:
-            try:
-                mapped_df = pd.read_excel(mapped_file, engine='openpyxl')
-            except:
-                mapped_df = pd.read_excel(mapped_file, engine='odf')
+        mapped_df = load_cached(mapped_file)
 
         reference_data = self._load_reference_data(reference_csv, dimension)
 
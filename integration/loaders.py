@@ -0,0 +1,234 @@
+"""
+Tabular File Loading for Curriculum Mapping Service
+
+Reads uploaded question banks and reference curricula (CSV, Excel, ODS)
+into DataFrames. Each upload is materialized once to a Parquet sidecar
+(``<file>.parquet``) so later endpoints read the columnar copy instead of
+re-parsing the original. The original file is kept for provenance.
+"""
+
+import os
+import uuid
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# PyArrow imports (optional dependency)
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    from pyarrow import parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("PyArrow not installed. Parquet upload cache and fast CSV reader disabled. Install with: pip install pyarrow")
+
+# Calamine (Rust) reads XLSX, XLS and ODS natively; needs pandas>=2.2 (optional dependency)
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = tuple(int(v) for v in pd.__version__.split('.')[:2]) >= (2, 2)
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+PARQUET_SUFFIX = '.parquet'
+
+# Schema metadata recording which version of the source a sidecar was built from
+SOURCE_SIZE_KEY = b'source_size'
+SOURCE_MTIME_KEY = b'source_mtime_ns'
+
+# PyArrow parses CSV blocks in parallel; 1MB blocks keep all cores busy on large files
+CSV_BLOCK_SIZE = 1 << 20
+
+
+def read_csv_fast(path: str) -> pd.DataFrame:
+    """
+    Parse a CSV with PyArrow's multithreaded reader.
+
+    Empty cells become NaN and all-empty columns float64, as with pandas.
+    Falls back to ``pd.read_csv`` when PyArrow is unavailable, rejects the
+    file (e.g. unusual quoting), or the header has blank/duplicate names that
+    pandas would rename ("Unnamed: 0", "Topic.1").
+    """
+    if PYARROW_AVAILABLE:
+        try:
+            table = pacsv.read_csv(
+                path,
+                read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+                convert_options=pacsv.ConvertOptions(strings_can_be_null=True)
+            )
+            names = table.column_names
+            if '' not in names and len(set(names)) == len(names):
+                schema = pa.schema([
+                    field.with_type(pa.float64()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ])
+                return table.cast(schema).to_pandas()
+        except Exception as e:
+            logger.debug(f"PyArrow CSV reader failed for {path}, using pandas: {e}")
+
+    return pd.read_csv(path)
+
+
+def read_table(path: str) -> pd.DataFrame:
+    """
+    Parse a CSV/Excel/ODS file from disk, dispatching on its extension.
+
+    Args:
+        path: Path to the source file
+
+    Returns:
+        Parsed DataFrame
+    """
+    lower = path.lower()
+
+    if lower.endswith('.csv'):
+        return read_csv_fast(path)
+    if lower.endswith('.ods'):
+        return _read_spreadsheet(path, fallback_engine='odf')
+    if lower.endswith('.xlsx') or lower.endswith('.xls'):
+        return _read_spreadsheet(path)
+
+    try:
+        return read_csv_fast(path)
+    except Exception:
+        return _read_spreadsheet(path)
+
+
+def _read_spreadsheet(path: str, fallback_engine: str = 'openpyxl') -> pd.DataFrame:
+    """Read an Excel/ODS file with calamine, or the pure-Python engine without it."""
+    if CALAMINE_AVAILABLE:
+        return pd.read_excel(path, engine='calamine')
+    return pd.read_excel(path, engine=fallback_engine)
+
+
+def materialize(df: pd.DataFrame, path: str, source_stat: os.stat_result) -> str:
+    """
+    Write the Parquet sidecar for a parsed source file.
+
+    The sidecar records the source's size and mtime (as stat'ed before it
+    was parsed), and is written to a temporary file that then replaces the
+    sidecar, so concurrent writers never truncate each other's output.
+
+    Failures (e.g. mixed-type object columns Arrow cannot encode) are logged
+    and ignored; callers then keep reading the original file.
+
+    Args:
+        df: Parsed contents of the source file
+        path: Path to the source file
+        source_stat: os.stat() of the source taken before parsing it
+
+    Returns:
+        Path to the sidecar, or None if it was not written
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+
+    sidecar = path + PARQUET_SUFFIX
+    tmp_path = f'{sidecar}.{uuid.uuid4().hex}.tmp'
+    try:
+        table = pa.Table.from_pandas(df)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            SOURCE_SIZE_KEY: str(source_stat.st_size).encode(),
+            SOURCE_MTIME_KEY: str(source_stat.st_mtime_ns).encode()
+        })
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, sidecar)
+        return sidecar
+    except Exception as e:
+        logger.warning(f"Could not materialize {path} to Parquet: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+
+def _open_current_sidecar(path: str):
+    """
+    Open the Parquet sidecar if it was built from the source as it is now.
+
+    Compares the source size and mtime recorded in the sidecar with the
+    source's current stat, so a sidecar finished late for an earlier upload
+    under the same name is never taken for the re-uploaded file. Callers
+    read from the returned handle, so a sidecar replaced after the check
+    cannot be read in its place.
+
+    Returns:
+        pq.ParquetFile (close it after reading), or None
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+
+    sidecar = path + PARQUET_SUFFIX
+    try:
+        source = os.stat(path)
+        parquet_file = pq.ParquetFile(sidecar)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable Parquet sidecar {sidecar}: {e}")
+        return None
+
+    metadata = parquet_file.schema_arrow.metadata or {}
+    if (metadata.get(SOURCE_SIZE_KEY) == str(source.st_size).encode()
+            and metadata.get(SOURCE_MTIME_KEY) == str(source.st_mtime_ns).encode()):
+        return parquet_file
+    parquet_file.close()
+    return None
+
+
+def load_cached(path: str) -> pd.DataFrame:
+    """
+    Load a tabular file, preferring its Parquet sidecar when it is current.
+
+    The sidecar is used when it was built from the current version of the
+    source (same size and mtime); otherwise the source is parsed and the
+    sidecar (re)written.
+
+    Args:
+        path: Path to the original CSV/Excel/ODS file
+
+    Returns:
+        Parsed DataFrame
+    """
+    parquet_file = _open_current_sidecar(path)
+    if parquet_file:
+        with parquet_file:
+            try:
+                return parquet_file.read().to_pandas()
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable Parquet sidecar for {path}: {e}")
+
+    # Stat before parsing: if the file is replaced mid-parse, the sidecar is
+    # recorded against the old version and so never served for the new one
+    source_stat = os.stat(path)
+    df = read_table(path)
+    materialize(df, path, source_stat)
+    return df
+
+
+def load_column(path: str, column: str) -> list:
+    """
+    Non-null values of a single column as a Python list.
+
+    With a current sidecar only that column is read from Parquet and converted
+    by Arrow in one pass, without building a DataFrame.
+
+    Returns:
+        List of values, or None if the file has no such column
+    """
+    parquet_file = _open_current_sidecar(path)
+    if parquet_file:
+        with parquet_file:
+            try:
+                if column not in parquet_file.schema_arrow.names:
+                    return None
+                return parquet_file.read(columns=[column]).column(0).drop_null().to_pylist()
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable Parquet sidecar for {path}: {e}")
+
+    df = load_cached(path)
+    if column not in df.columns:
+        return None
+    return df[column].dropna().tolist()
@@ -4,12 +4,53 @@ Generates static charts (PNG) for stakeholder reporting
 """
 
 import matplotlib.pyplot as plt
+import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend for server use
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
+import hashlib
+import io
+import json
 import os
+import tempfile
+import threading
 from datetime import datetime
 from collections import Counter
+from itertools import cycle
+
+from .cache import TTLCache
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Applied once per process rather than per engine instance. Bars are plain
+# rectangles, so Agg may simplify and chunk paths as aggressively as it likes.
+plt.style.use('seaborn-v0_8-whitegrid')
+matplotlib.rcParams['path.simplify'] = True
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+
+# zlib level 3 without Pillow's optimize pass: charts are mostly flat colour,
+# so this saves several times faster than the default for a slightly larger file
+PNG_PIL_KWARGS = {'compress_level': 3, 'optimize': False}
+
+# Horizontal bar charts are drawn straight onto a Pillow canvas (see _fast_barh);
+# same pixel size as the matplotlib version (12x6 in at 150 dpi)
+BARH_SIZE = (1800, 900)
+FONT_DIR = os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf')
+
+# Recently rendered PNGs kept in memory for serving (about 100 KB each)
+PNG_CACHE_TTL = 3600
+PNG_CACHE_SIZE = 64
+
+# Chart sets from recent generate_all_insights calls (five file paths each)
+CHART_CACHE_TTL = 3600
+CHART_CACHE_SIZE = 256
 
 
 class VisualizationEngine:
@@ -33,28 +74,230 @@ class VisualizationEngine:
         self.output_folder = output_folder
         os.makedirs(output_folder, exist_ok=True)
 
-        # Set style
-        plt.style.use('seaborn-v0_8-whitegrid')
         self.colors = ['#00a8cc', '#00d4aa', '#ffa600', '#ff6b6b', '#845ec2', '#4b8bbe', '#f9c74f']
 
-    def generate_topic_bar_chart(self, coverage_data, title="Questions per Topic Area"):
+        # content hash -> {chart_name: filepath} (see generate_all_insights)
+        self._cache = TTLCache(ttl=CHART_CACHE_TTL, maxsize=CHART_CACHE_SIZE)
+
+        # file name -> (PNG bytes, mtime_ns, mtime) of charts rendered by this process
+        self._pngs = TTLCache(ttl=PNG_CACHE_TTL, maxsize=PNG_CACHE_SIZE)
+
+        # Reusable Agg figures, one per size, per thread (or greenlet under gevent)
+        self._figures = threading.local()
+
+        # (size, bold) -> FreeType font for the Pillow bar charts, loaded once
+        self._fonts = {}
+        self._fast_charts = PIL_AVAILABLE and os.path.exists(os.path.join(FONT_DIR, 'DejaVuSans.ttf'))
+
+    def _figure(self, figsize, layout=None):
+        """
+        A cleared Figure of the given size (and layout engine), reused across calls.
+
+        Built on FigureCanvasAgg directly rather than through pyplot, so
+        there is no global figure registry and no per-chart Figure/canvas
+        construction. Figures are per thread because a chart is drawn in
+        several steps.
+        """
+        figures = getattr(self._figures, 'by_size', None)
+        if figures is None:
+            figures = self._figures.by_size = {}
+
+        fig = figures.get((figsize, layout))
+        if fig is None:
+            fig = Figure(figsize=figsize, layout=layout)
+            FigureCanvasAgg(fig)
+            figures[(figsize, layout)] = fig
+        else:
+            fig.clear()
+        return fig
+
+    def _font(self, size, bold=False):
+        """DejaVu Sans (shipped with matplotlib) at the given pixel size"""
+        font = self._fonts.get((size, bold))
+        if font is None:
+            name = 'DejaVuSans-Bold.ttf' if bold else 'DejaVuSans.ttf'
+            font = self._fonts[(size, bold)] = ImageFont.truetype(os.path.join(FONT_DIR, name), size)
+        return font
+
+    @staticmethod
+    def _tick_step(max_value):
+        """Round (1/2/5 x 10^n) integer tick spacing giving about 6 ticks up to max_value"""
+        raw = max(max_value / 6, 1)
+        magnitude = 10 ** (len(str(int(raw))) - 1)
+        for multiple in (1, 2, 5, 10):
+            if multiple * magnitude >= raw:
+                return multiple * magnitude
+
+    def _fast_barh(self, labels, counts, colors, title, filepath, value_labels=None, legend=None):
+        """
+        Render a horizontal bar chart directly with Pillow.
+
+        Bar geometry is plain arithmetic, so there is no figure, text layout
+        engine or tight-layout pass; this is several times faster than
+        matplotlib for the simple per-topic charts.
+
+        Args:
+            labels (list): Bar labels, top to bottom
+            counts (list): Bar values
+            colors (list): Bar colours (cycled if shorter than labels)
+            title (str): Chart title
+            filepath (str): Output PNG path
+            value_labels (list): Optional (text, colour) drawn after each bar
+                (default: the count in black)
+            legend (list): Optional (colour, text) entries, drawn lower right
+
+        Returns:
+            str: Path to saved PNG file
+        """
+        width, height = BARH_SIZE
+        img = Image.new('RGB', BARH_SIZE, 'white')
+        draw = ImageDraw.Draw(img)
+
+        title_font = self._font(29, bold=True)
+        axis_font = self._font(25)
+        tick_font = self._font(21)
+
+        draw.text((width / 2, 55), title, font=title_font, fill='#262626', anchor='mm')
+
+        # Bars get smaller text when there are many of them
+        top, bottom = 90, height - 110
+        row_height = (bottom - top) / max(len(labels), 1)
+        label_font = self._font(max(8, min(21, int(row_height * 0.6))))
+        value_font = self._font(max(8, min(21, int(row_height * 0.6))), bold=True)
+
+        max_label = width * 0.4
+        shown = []
+        for label in labels:
+            label = str(label)
+            if draw.textlength(label, font=label_font) > max_label:
+                while label and draw.textlength(label + '…', font=label_font) > max_label:
+                    label = label[:-1]
+                label += '…'
+            shown.append(label)
+        left = 30 + max((draw.textlength(label, font=label_font) for label in shown), default=0) + 12
+        right = width - 60
+
+        # x axis: integer ticks with headroom for the value labels
+        max_count = max(counts, default=0)
+        step = self._tick_step(max_count)
+        x_max = max(max_count * 1.08, 1)
+        scale = (right - left) / x_max
+
+        for tick in range(0, int(x_max) + 1, step):
+            x = left + tick * scale
+            draw.line([(x, top), (x, bottom)], fill='#cccccc', width=2)
+            draw.text((x, bottom + 10), str(tick), font=tick_font, fill='#262626', anchor='mt')
+        draw.text(((left + right) / 2, height - 45), 'Number of Questions', font=axis_font,
+                  fill='#262626', anchor='mm')
+
+        if value_labels is None:
+            value_labels = [(str(count), 'black') for count in counts]
+
+        for i, (label, count, color, (value_text, value_color)) in enumerate(
+                zip(shown, counts, cycle(colors or ['#00a8cc']), value_labels)):
+            center = top + (i + 0.5) * row_height
+            draw.line([(left, center), (right, center)], fill='#cccccc', width=2)
+            if count > 0:
+                draw.rectangle([left, center - row_height * 0.4, left + count * scale, center + row_height * 0.4],
+                               fill=color)
+            draw.text((left - 12, center), label, font=label_font, fill='#262626', anchor='rm')
+            draw.text((left + max(count, 0.5) * scale + 8, center), value_text, font=value_font,
+                      fill=value_color, anchor='lm')
+
+        draw.rectangle([left, top, right, bottom], outline='#cccccc', width=2)
+
+        if legend:
+            line_height = 32
+            box_width = 30 + max(draw.textlength(text, font=tick_font) for _, text in legend) + 50
+            x0, y0 = right - box_width - 15, bottom - 15 - line_height * len(legend)
+            draw.rectangle([x0, y0, right - 15, bottom - 15], fill='white', outline='#dddddd')
+            for i, (color, text) in enumerate(legend):
+                y = y0 + (i + 0.5) * line_height
+                draw.rectangle([x0 + 12, y - 7, x0 + 52, y + 7], fill=color)
+                draw.text((x0 + 64, y), text, font=tick_font, fill='#262626', anchor='lm')
+
+        return self._save_png(img, filepath)
+
+    def _save_png(self, chart, filepath):
+        """
+        Encode a Figure or Pillow image to PNG once, write it to disk and keep
+        the bytes in memory so get_png can serve it without reading the file.
+
+        The file is written under a temporary name and renamed into place, so
+        other workers never see (or serve) a half-written chart.
+
+        Returns:
+            str: filepath
+        """
+        buf = io.BytesIO()
+        if isinstance(chart, Figure):
+            chart.savefig(buf, format='png', dpi=150, pil_kwargs=PNG_PIL_KWARGS)
+        else:
+            chart.save(buf, 'PNG', **PNG_PIL_KWARGS)
+        data = buf.getvalue()
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        st = os.stat(filepath)
+        self._pngs.set(os.path.basename(filepath), (data, st.st_mtime_ns, st.st_mtime))
+        return filepath
+
+    def get_png(self, filename):
+        """
+        A chart recently rendered by this engine, from memory.
+
+        Args:
+            filename (str): Chart file name (basename)
+
+        Returns:
+            tuple: (PNG bytes, mtime_ns, mtime) as written to disk, or None
+        """
+        return self._pngs.get(filename)
+
+    @staticmethod
+    def _sorted_pairs(coverage_data, reverse=False):
+        """(topics, counts) of a {topic: count} dict, ordered by count, then topic"""
+        items = sorted(coverage_data.items(), key=lambda kv: (kv[1], kv[0]), reverse=reverse)
+        return tuple(zip(*items)) if items else ((), ())
+
+    def _chart_path(self, name, suffix=None):
+        """
+        Output path for a chart: <name>_<suffix>.png.
+
+        The default suffix is a microsecond timestamp, so two direct calls in
+        the same second (e.g. concurrent requests) don't overwrite each other.
+        generate_all_insights passes a content hash shared by all five charts.
+        """
+        suffix = suffix or datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        return os.path.join(self.output_folder, f"{name}_{suffix}.png")
+
+    def generate_topic_bar_chart(self, coverage_data, title="Questions per Topic Area", suffix=None):
         """
         Generate bar chart showing question count per topic area.
 
         Args:
             coverage_data (dict): {topic: count, ...}
             title (str): Chart title
+            suffix (str): File name suffix (default: current timestamp)
 
         Returns:
             str: Path to saved PNG file
         """
-        fig, ax = plt.subplots(figsize=(12, 6))
+        topics, counts = self._sorted_pairs(coverage_data, reverse=True)
 
-        topics = list(coverage_data.keys())
-        counts = list(coverage_data.values())
+        filepath = self._chart_path('topic_bar_chart', suffix)
+        if self._fast_charts:
+            return self._fast_barh(topics, counts, self.colors, title, filepath)
 
-        sorted_pairs = sorted(zip(counts, topics), reverse=True)
-        counts, topics = zip(*sorted_pairs) if sorted_pairs else ([], [])
+        fig = self._figure((12, 6))
+        ax = fig.add_subplot(111)
 
         bars = ax.barh(topics, counts, color=self.colors[:len(topics)])
 
@@ -66,30 +309,26 @@ class VisualizationEngine:
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
         ax.invert_yaxis()
 
-        plt.tight_layout()
-
-        filename = f"topic_bar_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_folder, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
 
-        return filepath
+        return self._save_png(fig, filepath)
 
-    def generate_percentage_pie_chart(self, coverage_data, title="Topic Distribution (%)"):
+    def generate_percentage_pie_chart(self, coverage_data, title="Topic Distribution (%)", suffix=None):
         """
         Generate pie/donut chart showing percentage distribution.
 
         Args:
             coverage_data (dict): {topic: count, ...}
             title (str): Chart title
+            suffix (str): File name suffix (default: current timestamp)
 
         Returns:
             str: Path to saved PNG file
         """
-        fig, ax = plt.subplots(figsize=(10, 8))
+        fig = self._figure((13, 8))
+        ax = fig.add_subplot(111)
 
-        topics = list(coverage_data.keys())
-        counts = list(coverage_data.values())
+        topics, counts = tuple(zip(*coverage_data.items())) if coverage_data else ((), ())
         total = sum(counts) if counts else 1
 
         labels = [f"{t}\n({c}, {c/total*100:.1f}%)" for t, c in zip(topics, counts)]
@@ -103,40 +342,42 @@ class VisualizationEngine:
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
         ax.text(0, 0, f'Total\n{total}', ha='center', va='center', fontsize=16, fontweight='bold')
 
-        plt.tight_layout()
-
-        filename = f"topic_pie_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_folder, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
+        # Leave the right 30% of the canvas for the legend
+        fig.subplots_adjust(left=0.02, right=0.7, top=0.9, bottom=0.05)
 
-        return filepath
+        filepath = self._chart_path('topic_pie_chart', suffix)
+        return self._save_png(fig, filepath)
 
-    def generate_confidence_histogram(self, confidence_scores, title="Confidence Score Distribution"):
+    def generate_confidence_histogram(self, confidence_scores, title="Confidence Score Distribution",
+                                      suffix=None):
         """
         Generate histogram of confidence scores.
 
         Args:
             confidence_scores (list): List of confidence values (0.0-1.0)
             title (str): Chart title
+            suffix (str): File name suffix (default: current timestamp)
 
         Returns:
             str: Path to saved PNG file
         """
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig = self._figure((10, 6))
+        ax = fig.add_subplot(111)
 
         bins = [0, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 1.0]
         bin_labels = ['<50%', '50-60%', '60-70%', '70-80%', '80-85%', '85-90%', '90-95%', '95-100%']
 
-        counts, edges, patches = ax.hist(confidence_scores, bins=bins, edgecolor='white', linewidth=1.2)
-
-        for i, patch in enumerate(patches):
-            if edges[i] < 0.7:
-                patch.set_facecolor('#ff6b6b')
-            elif edges[i] < 0.85:
-                patch.set_facecolor('#ffa600')
-            else:
-                patch.set_facecolor('#00d4aa')
+        # Binned once by NumPy and drawn as one unit-wide bar per bin (labelled
+        # with bin_labels), rather than ax.hist re-binning and autoscaling
+        scores = np.asarray(confidence_scores, dtype=np.float64)
+        counts, edges = np.histogram(scores, bins=bins)
+        colors = np.select([edges[:-1] < 0.7, edges[:-1] < 0.85], ['#ff6b6b', '#ffa600'],
+                           default='#00d4aa').tolist()
+        positions = np.arange(len(counts))
+        patches = ax.bar(positions, counts, width=1.0, align='edge',
+                         color=colors, edgecolor='white', linewidth=1.2)
+        ax.set_xticks(positions + 0.5, bin_labels)
+        ax.set_ylim(0, max(counts.max(), 1) * 1.3)  # headroom for the count labels and stats box
 
         for count, patch in zip(counts, patches):
             if count > 0:
@@ -155,22 +396,19 @@ class VisualizationEngine:
         ]
         ax.legend(handles=legend_elements, loc='upper left')
 
-        avg_conf = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
-        high_conf = sum(1 for c in confidence_scores if c >= 0.85)
-        stats_text = f"Avg: {avg_conf:.1%} | High Confidence: {high_conf}/{len(confidence_scores)}"
+        avg_conf = scores.mean() if scores.size else 0
+        high_conf = int((scores >= 0.85).sum())
+        stats_text = f"Avg: {avg_conf:.1%} | High Confidence: {high_conf}/{scores.size}"
         ax.text(0.98, 0.98, stats_text, transform=ax.transAxes, ha='right', va='top',
                 fontsize=10, bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
 
-        plt.tight_layout()
+        fig.tight_layout()
 
-        filename = f"confidence_histogram_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_folder, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
+        filepath = self._chart_path('confidence_histogram', suffix)
+        return self._save_png(fig, filepath)
 
-        return filepath
-
-    def generate_gap_analysis_chart(self, coverage_data, reference_topics, title="Curriculum Coverage & Gaps"):
+    def generate_gap_analysis_chart(self, coverage_data, reference_topics, title="Curriculum Coverage & Gaps",
+                                    suffix=None):
         """
         Generate chart highlighting topics with zero or low coverage.
 
@@ -178,30 +416,33 @@ class VisualizationEngine:
             coverage_data (dict): {topic: count, ...}
             reference_topics (list): All possible topics from reference
             title (str): Chart title
+            suffix (str): File name suffix (default: current timestamp)
 
         Returns:
             str: Path to saved PNG file
         """
-        fig, ax = plt.subplots(figsize=(12, 6))
+        all_topics = {topic: coverage_data.get(topic, 0) for topic in reference_topics}
+        topics, counts = self._sorted_pairs(all_topics)
 
-        all_topics = {}
-        for topic in reference_topics:
-            all_topics[topic] = coverage_data.get(topic, 0)
+        counts_arr = np.asarray(counts)
+        colors = np.select([counts_arr == 0, counts_arr <= 2], ['#ff6b6b', '#ffa600'],
+                           default='#00d4aa').tolist()
 
-        topics = list(all_topics.keys())
-        counts = list(all_topics.values())
+        legend = [
+            ('#ff6b6b', 'Gap (0 questions)'),
+            ('#ffa600', 'Low (1-2 questions)'),
+            ('#00d4aa', 'Good (3+ questions)')
+        ]
 
-        sorted_pairs = sorted(zip(counts, topics))
-        counts, topics = zip(*sorted_pairs) if sorted_pairs else ([], [])
+        filepath = self._chart_path('gap_analysis', suffix)
+        if self._fast_charts:
+            # Largest at the top, as barh draws the sorted list bottom-up
+            value_labels = [(str(count), 'black') if count > 0 else ('GAP', '#ff6b6b') for count in counts]
+            return self._fast_barh(topics[::-1], counts[::-1], colors[::-1], title, filepath,
+                                   value_labels=value_labels[::-1], legend=legend)
 
-        colors = []
-        for count in counts:
-            if count == 0:
-                colors.append('#ff6b6b')
-            elif count <= 2:
-                colors.append('#ffa600')
-            else:
-                colors.append('#00d4aa')
+        fig = self._figure((12, 6))
+        ax = fig.add_subplot(111)
 
         bars = ax.barh(topics, counts, color=colors)
 
@@ -215,24 +456,15 @@ class VisualizationEngine:
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
 
         from matplotlib.patches import Patch
-        legend_elements = [
-            Patch(facecolor='#ff6b6b', label='Gap (0 questions)'),
-            Patch(facecolor='#ffa600', label='Low (1-2 questions)'),
-            Patch(facecolor='#00d4aa', label='Good (3+ questions)')
-        ]
+        legend_elements = [Patch(facecolor=color, label=text) for color, text in legend]
         ax.legend(handles=legend_elements, loc='lower right')
 
-        plt.tight_layout()
-
-        filename = f"gap_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_folder, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
+        fig.tight_layout()
 
-        return filepath
+        return self._save_png(fig, filepath)
 
     def generate_summary_dashboard(self, coverage_data, confidence_scores, reference_topics,
-                                   title="Curriculum Mapping Summary"):
+                                   title="Curriculum Mapping Summary", suffix=None):
         """
         Generate a combined dashboard with multiple charts.
 
@@ -241,13 +473,18 @@ class VisualizationEngine:
             confidence_scores (list): List of confidence values
             reference_topics (list): All possible topics
             title (str): Dashboard title
+            suffix (str): File name suffix (default: current timestamp)
 
         Returns:
             str: Path to saved PNG file
         """
-        fig = plt.figure(figsize=(16, 12))
+        # Constrained layout places the four panels and suptitle in the draw
+        # pass itself, instead of tight_layout's separate iterative bbox solve
+        fig = self._figure((16, 12), layout='constrained')
+        fig.get_layout_engine().set(w_pad=0.05, h_pad=0.05, hspace=0.02, wspace=0.02)
+        scores = np.asarray(confidence_scores, dtype=np.float64)
 
-        fig.suptitle(title, fontsize=18, fontweight='bold', y=0.98)
+        fig.suptitle(title, fontsize=18, fontweight='bold')
 
         ax1 = fig.add_subplot(2, 2, 1)
         ax2 = fig.add_subplot(2, 2, 2)
@@ -255,11 +492,8 @@ class VisualizationEngine:
         ax4 = fig.add_subplot(2, 2, 4)
 
         # 1. Bar chart
-        topics = list(coverage_data.keys())
-        counts = list(coverage_data.values())
-        sorted_pairs = sorted(zip(counts, topics), reverse=True)
-        if sorted_pairs:
-            counts, topics = zip(*sorted_pairs)
+        if coverage_data:
+            topics, counts = self._sorted_pairs(coverage_data, reverse=True)
             ax1.barh(topics, counts, color=self.colors[:len(topics)])
             ax1.set_xlabel('Questions')
             ax1.set_title('Questions per Topic', fontweight='bold')
@@ -267,15 +501,18 @@ class VisualizationEngine:
 
         # 2. Pie chart
         if coverage_data:
-            ax2.pie(list(coverage_data.values()), labels=list(coverage_data.keys()),
+            pie_topics, pie_counts = zip(*coverage_data.items())
+            ax2.pie(pie_counts, labels=pie_topics,
                     colors=self.colors[:len(coverage_data)], autopct='%1.1f%%', startangle=90)
             ax2.set_title('Topic Distribution', fontweight='bold')
 
         # 3. Confidence histogram
-        if confidence_scores:
+        if scores.size:
             bins = [0, 0.7, 0.85, 1.0]
             colors_hist = ['#ff6b6b', '#ffa600', '#00d4aa']
-            ax3.hist(confidence_scores, bins=bins, color=self.colors[0], edgecolor='white')
+            hist_counts, edges = np.histogram(scores, bins=bins)
+            ax3.bar(edges[:-1], hist_counts, width=np.diff(edges), align='edge',
+                    color=self.colors[0], edgecolor='white')
             ax3.set_xlabel('Confidence Score')
             ax3.set_ylabel('Count')
             ax3.set_title('Confidence Distribution', fontweight='bold')
@@ -283,8 +520,8 @@ class VisualizationEngine:
         # 4. Summary stats
         ax4.axis('off')
         total_questions = sum(coverage_data.values()) if coverage_data else 0
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
-        high_conf = sum(1 for c in confidence_scores if c >= 0.85)
+        avg_confidence = scores.mean() if scores.size else 0
+        high_conf = int((scores >= 0.85).sum())
         gaps = [t for t in reference_topics if coverage_data.get(t, 0) == 0]
         high_conf_pct = (high_conf / total_questions * 100) if total_questions > 0 else 0
 
@@ -305,14 +542,8 @@ class VisualizationEngine:
                  verticalalignment='top', fontfamily='monospace',
                  bbox=dict(boxstyle='round', facecolor='#f0f0f0', alpha=0.8))
 
-        plt.tight_layout(rect=[0, 0, 1, 0.96])
-
-        filename = f"summary_dashboard_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_folder, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-
-        return filepath
+        filepath = self._chart_path('summary_dashboard', suffix)
+        return self._save_png(fig, filepath)
 
     def generate_all_insights(self, mapping_data, reference_topics):
         """
@@ -320,25 +551,58 @@ class VisualizationEngine:
 
         Args:
             mapping_data (dict): Result from audit engine containing:
-                - recommendations: list of mapping recommendations
+                - recommendations: list of mapping recommendations, a DataFrame,
+                  or a columnar dict such as {'confidence': [...], 'question_num': [...]}
                 - coverage: dict of topic counts
             reference_topics (list): All possible topics from reference
 
         Returns:
             dict: {chart_name: filepath, ...}
+
+        Charts are named after a hash of their inputs, so identical data
+        reuses the PNGs already on disk (also across processes) instead of
+        rendering them again.
         """
         coverage = mapping_data.get('coverage', {})
         recommendations = mapping_data.get('recommendations', [])
-        confidence_scores = [r.get('confidence', 0) for r in recommendations]
-
-        charts = {}
-
-        charts['topic_bar_chart'] = self.generate_topic_bar_chart(coverage)
-        charts['topic_pie_chart'] = self.generate_percentage_pie_chart(coverage)
-        charts['confidence_histogram'] = self.generate_confidence_histogram(confidence_scores)
-        charts['gap_analysis'] = self.generate_gap_analysis_chart(coverage, reference_topics)
-        charts['summary_dashboard'] = self.generate_summary_dashboard(
-            coverage, confidence_scores, reference_topics
-        )
-
-        return charts
+        if hasattr(recommendations, 'columns'):
+            if 'confidence' in recommendations.columns:
+                confidence_scores = recommendations['confidence'].fillna(0).to_numpy(dtype=np.float64)
+            else:
+                confidence_scores = np.zeros(len(recommendations))
+        elif isinstance(recommendations, dict):
+            confidence_scores = np.asarray(recommendations.get('confidence', []), dtype=np.float64)
+        else:
+            confidence_scores = np.fromiter((r.get('confidence', 0) for r in recommendations),
+                                            dtype=np.float64, count=len(recommendations))
+
+        # Item order matters (pie/legend order), so coverage is hashed as pairs
+        digest = hashlib.blake2b(json.dumps({
+            'coverage': list(coverage.items()),
+            'ref': list(reference_topics)
+        }, default=str).encode(), digest_size=8)
+        digest.update(confidence_scores.tobytes())
+        key = digest.hexdigest()
+
+        charts = self._cache.get(key) or {
+            name: self._chart_path(name, key)
+            for name in ('topic_bar_chart', 'topic_pie_chart', 'confidence_histogram',
+                         'gap_analysis', 'summary_dashboard')
+        }
+        if all(os.path.exists(path) for path in charts.values()):
+            self._cache.set(key, charts)
+            return dict(charts)
+
+        # Rendered one after another: matplotlib is not thread-safe
+        charts = {
+            'topic_bar_chart': self.generate_topic_bar_chart(coverage, suffix=key),
+            'topic_pie_chart': self.generate_percentage_pie_chart(coverage, suffix=key),
+            'confidence_histogram': self.generate_confidence_histogram(confidence_scores, suffix=key),
+            'gap_analysis': self.generate_gap_analysis_chart(coverage, reference_topics, suffix=key),
+            'summary_dashboard': self.generate_summary_dashboard(
+                coverage, confidence_scores, reference_topics, suffix=key
+            )
+        }
+
+        self._cache.set(key, charts)
+        return dict(charts)
@@ -8,15 +8,17 @@ Three Tools:
 3. Generate Insights & Visualizations
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
-import pandas as pd
+import hashlib
 import os
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 
-from objectives_engine import ObjectivesEngine, OBJECTIVES_REFERENCE
-from objectives_viz import ObjectivesVizEngine
+from objectives_engine import ObjectivesEngine, OBJECTIVES_REFERENCE, BATCH_SIZE, read_question_file
+from objectives_viz import ObjectivesVizEngine, warm_chart_pool
+import matplotlib
+import matplotlib.font_manager
 
 # Load environment variables
 load_dotenv()
@@ -39,6 +41,15 @@ app.config['OUTPUT_FOLDER'] = OUTPUT_FOLDER
 app.config['INSIGHTS_FOLDER'] = INSIGHTS_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
 
+# The objectives reference never changes at runtime: encode it once
+OBJECTIVES_JSON = app.json.response({
+    'objectives': [
+        {'id': obj_id, 'description': desc}
+        for obj_id, desc in OBJECTIVES_REFERENCE.items()
+    ]
+}).get_data()
+OBJECTIVES_ETAG = hashlib.sha1(OBJECTIVES_JSON).hexdigest()
+
 # Initialize engines
 print("[*] Initializing Objectives Mapping Engine...")
 
@@ -46,7 +57,9 @@ azure_config = {
     'api_key': os.getenv('AZURE_OPENAI_API_KEY'),
     'azure_endpoint': os.getenv('AZURE_OPENAI_ENDPOINT'),
     'api_version': os.getenv('AZURE_OPENAI_API_VERSION', '2024-02-15-preview'),
-    'deployment': os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-4')
+    'deployment': os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-4'),
+    'max_concurrency': int(os.getenv('AZURE_OPENAI_MAX_CONCURRENCY', '8')),
+    'response_cache': os.getenv('OBJECTIVES_RESPONSE_CACHE') or None
 }
 
 if not azure_config['api_key'] or not azure_config['azure_endpoint']:
@@ -66,11 +79,42 @@ except Exception as e:
     print(f"[ERROR] Init failed: {e}")
     exit(1)
 
+# Load matplotlib's font cache now rather than on the first chart request,
+# resolving the default font of the style ObjectivesVizEngine applied
+matplotlib.font_manager.findfont(matplotlib.font_manager.FontProperties())
+
+# Fork the chart workers (which inherit the loaded cache) before any request threads exist
+warm_chart_pool()
+
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def _run_engine_op(op, required=('filename',), require_file=True):
+    """
+    Shared body of the map/rate/export endpoints: validate the JSON request,
+    resolve the uploaded file and run an engine operation on it.
+
+    Args:
+        op (callable): Called as op(filepath, data); returns the response
+        required (tuple): Request keys that must be present and non-empty
+        require_file (bool): Return 404 if the uploaded file is missing
+    """
+    data = request.json
+    if not all(data.get(key) for key in required):
+        return jsonify({'error': f"{' and '.join(required)} required"}), 400
+
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], data['filename'])
+    if require_file and not os.path.exists(filepath):
+        return jsonify({'error': 'File not found'}), 404
+
+    try:
+        return op(filepath, data)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 # ============================================
 # Health & Reference
 # ============================================
@@ -88,12 +132,10 @@ def health():
 @app.route('/api/objectives', methods=['GET'])
 def get_objectives():
     """Get list of available objectives"""
-    return jsonify({
-        'objectives': [
-            {'id': obj_id, 'description': desc}
-            for obj_id, desc in OBJECTIVES_REFERENCE.items()
-        ]
-    })
+    response = Response(OBJECTIVES_JSON, mimetype='application/json',
+                        headers={'Cache-Control': 'public, max-age=86400'})
+    response.set_etag(OBJECTIVES_ETAG)
+    return response.make_conditional(request)
 
 
 # ============================================
@@ -119,16 +161,14 @@ def upload_questions():
 
     # Read and validate
     try:
-        if filepath.endswith('.csv'):
-            df = pd.read_csv(filepath)
-        elif filepath.endswith('.ods'):
-            df = pd.read_excel(filepath, engine='odf')
-        else:
-            df = pd.read_excel(filepath, engine='openpyxl')
+        df = read_question_file(filepath, arrow_dtypes=True)
 
         # Count non-stem questions
-        question_count = len([1 for _, r in df.iterrows()
-                             if '(Stem)' not in str(r.get('Question Number', ''))])
+        if 'Question Number' in df.columns:
+            question_count = int((~df['Question Number'].astype(str).str.contains(
+                r'\(Stem\)', regex=True, na=False)).sum())
+        else:
+            question_count = len(df)
 
         return jsonify({
             'status': 'success',
@@ -153,7 +193,7 @@ def tool1_map():
     Request:
         {
             "filename": "questions.csv",
-            "batch_size": 5
+            "batch_size": 20
         }
 
     Returns:
@@ -163,22 +203,10 @@ def tool1_map():
             "gaps": [...]
         }
     """
-    data = request.json
-    filename = data.get('filename')
-    batch_size = data.get('batch_size', 5)
-
-    if not filename:
-        return jsonify({'error': 'filename required'}), 400
+    def run(filepath, data):
+        return jsonify(engine.map_questions(filepath, batch_size=data.get('batch_size', BATCH_SIZE)))
 
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    if not os.path.exists(filepath):
-        return jsonify({'error': 'File not found'}), 404
-
-    try:
-        result = engine.map_questions(filepath, batch_size=batch_size)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return _run_engine_op(run)
 
 
 @app.route('/api/tool1/export', methods=['POST'])
@@ -190,30 +218,22 @@ def tool1_export():
         {
             "filename": "questions.csv",
             "recommendations": [...],
-            "selected_indices": [0, 1, 2]
+            "selected_indices": [0, 1, 2],
+            "output_format": "xlsx"  # or "csv"
         }
     """
-    data = request.json
-    filename = data.get('filename')
-    recommendations = data.get('recommendations', [])
-    selected = data.get('selected_indices', [])
-
-    if not filename or not recommendations:
-        return jsonify({'error': 'filename and recommendations required'}), 400
-
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-
-    try:
+    def export(filepath, data):
         output_path = engine.apply_and_export(
-            filepath, recommendations, selected, app.config['OUTPUT_FOLDER']
+            filepath, data['recommendations'], data.get('selected_indices', []),
+            app.config['OUTPUT_FOLDER'], output_format=data.get('output_format', 'xlsx')
         )
         return jsonify({
             'status': 'success',
             'output_file': os.path.basename(output_path),
             'download_url': f'/api/download/{os.path.basename(output_path)}'
         })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+
+    return _run_engine_op(export, required=('filename', 'recommendations'), require_file=False)
 
 
 # ============================================
@@ -228,7 +248,7 @@ def tool2_rate():
     Request:
         {
             "filename": "mapped_questions.xlsx",
-            "batch_size": 5
+            "batch_size": 20
         }
 
     Returns:
@@ -238,22 +258,10 @@ def tool2_rate():
             "recommendations": [...]
         }
     """
-    data = request.json
-    filename = data.get('filename')
-    batch_size = data.get('batch_size', 5)
+    def run(filepath, data):
+        return jsonify(engine.rate_mappings(filepath, batch_size=data.get('batch_size', BATCH_SIZE)))
 
-    if not filename:
-        return jsonify({'error': 'filename required'}), 400
-
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    if not os.path.exists(filepath):
-        return jsonify({'error': 'File not found'}), 404
-
-    try:
-        result = engine.rate_mappings(filepath, batch_size=batch_size)
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return _run_engine_op(run)
 
 
 @app.route('/api/tool2/export', methods=['POST'])
@@ -265,30 +273,22 @@ def tool2_export():
         {
             "filename": "mapped_questions.xlsx",
             "recommendations": [...],
-            "selected_indices": [0, 1, 2]
+            "selected_indices": [0, 1, 2],
+            "output_format": "xlsx"  # or "csv"
         }
     """
-    data = request.json
-    filename = data.get('filename')
-    recommendations = data.get('recommendations', [])
-    selected = data.get('selected_indices', [])
-
-    if not filename or not recommendations:
-        return jsonify({'error': 'filename and recommendations required'}), 400
-
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-
-    try:
+    def export(filepath, data):
         output_path = engine.apply_and_export(
-            filepath, recommendations, selected, app.config['OUTPUT_FOLDER']
+            filepath, data['recommendations'], data.get('selected_indices', []),
+            app.config['OUTPUT_FOLDER'], output_format=data.get('output_format', 'xlsx')
         )
         return jsonify({
             'status': 'success',
             'output_file': os.path.basename(output_path),
             'download_url': f'/api/download/{os.path.basename(output_path)}'
         })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+
+    return _run_engine_op(export, required=('filename', 'recommendations'), require_file=False)
 
 
 # ============================================
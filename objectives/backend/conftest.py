@@ -0,0 +1,10 @@
+"""
+pytest configuration for the Objectives Mapping tests
+
+Selects matplotlib's Agg backend before anything imports pyplot, so chart
+tests never probe for a GUI backend (Tk/Qt) on machines with a DISPLAY.
+Charts are rendered to PNG through Agg only.
+"""
+
+import matplotlib
+matplotlib.use('Agg', force=True)
@@ -3,13 +3,55 @@ Objectives Mapping Engine
 Maps medical education questions to Learning Objectives (O1-O6) using Azure OpenAI
 """
 
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI, APIConnectionError, InternalServerError, RateLimitError
 import pandas as pd
+import numpy as np
+import asyncio
+import hashlib
 import json
+import sqlite3
+import threading
 from datetime import datetime
+from types import MappingProxyType
 import os
+import random
 import time
 
+# Fast readers (optional): PyArrow's CSV engine, and calamine for Excel/ODS,
+# which pandas supports from 2.2
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = tuple(int(v) for v in pd.__version__.split('.')[:2]) >= (2, 2)
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+# xlsxwriter (optional dependency): streams export rows to disk
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+# orjson (optional dependency): faster parsing of model responses
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ijson (optional dependency): parses streamed responses as they arrive
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 
 # Objectives Reference Data (O1-O6)
 OBJECTIVES_REFERENCE = {
@@ -20,6 +62,218 @@ OBJECTIVES_REFERENCE = {
     'O5': 'Describe laboratory diagnosis of human infections',
     'O6': 'Describe prophylaxis for infecting microorganisms'
 }
+OBJECTIVES_KEYS = frozenset(OBJECTIVES_REFERENCE)
+# Read-only template for coverage tallies: copy with dict(ZERO_COVERAGE)
+ZERO_COVERAGE = MappingProxyType({obj: 0 for obj in OBJECTIVES_REFERENCE})
+
+# Batch prompts sent to Azure OpenAI at the same time (per map/rate call)
+MAX_CONCURRENCY = 8
+
+# Transient API errors (429s, timeouts, dropped connections, 5xx) are retried
+# with randomized exponential backoff: up to RETRY_ATTEMPTS tries, waiting
+# between RETRY_MIN_WAIT and RETRY_MAX_WAIT seconds
+RETRY_ATTEMPTS = 5
+RETRY_MIN_WAIT = 1
+RETRY_MAX_WAIT = 20
+TRANSIENT_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+# Questions per prompt (default batch_size) and the completion limit that fits them
+BATCH_SIZE = 20
+MAX_TOKENS = 4000
+
+# Parsed model responses from earlier runs, reused when a batch prompt repeats.
+# Opt-in (config 'response_cache'); entries expire after RESPONSE_CACHE_TTL seconds
+RESPONSE_CACHE_PATH = '.objectives_cache.sqlite3'
+RESPONSE_CACHE_TTL = 7 * 24 * 3600
+
+# Seconds between status checks of a Batch API job (use_batch_api=True)
+BATCH_POLL_INTERVAL = 30
+
+SYSTEM_PROMPT = "You are a medical education expert. Respond with valid JSON only."
+
+# Batch prompt templates: {questions_block} is filled per batch, {objectives}
+# once per engine (see _prompt_parts)
+MAP_PROMPT = """You are a medical education curriculum mapping expert.
+
+Map EACH question to the most appropriate Learning Objective.
+
+QUESTIONS:
+{questions_block}
+
+AVAILABLE OBJECTIVES:
+{objectives}
+
+Respond in JSON format:
+{{
+    "mappings": [
+        {{
+            "question_id": "...",
+            "objective_id": "O1-O6",
+            "confidence": 0.XX,
+            "reason": "Brief one-line explanation"
+        }}
+    ]
+}}
+
+Rules:
+- Map each question to exactly ONE objective (O1-O6)
+- Confidence: 0.0-1.0 (how certain you are)
+- Reason: Keep to one brief sentence
+"""
+
+RATE_PROMPT = """You are a medical education curriculum mapping expert.
+
+TASK: Evaluate existing objective mappings. Rate each and suggest better if needed.
+
+QUESTIONS WITH CURRENT MAPPINGS:
+{questions_block}
+
+AVAILABLE OBJECTIVES:
+{objectives}
+
+Respond in JSON format:
+{{
+    "ratings": [
+        {{
+            "question_id": "...",
+            "rating": "correct" | "partially_correct" | "incorrect",
+            "agreement_score": 0.XX,
+            "rating_reason": "Brief explanation",
+            "suggested_objective": "O1-O6",
+            "suggestion_confidence": 0.XX,
+            "suggestion_reason": "Why this is better (if different)"
+        }}
+    ]
+}}
+
+Rules:
+- rating: "correct" if mapping is accurate, "partially_correct" if somewhat related, "incorrect" if wrong
+- agreement_score: 1.0 = perfect match, 0.0 = completely wrong
+- If current is correct, suggested_objective should match current
+"""
+
+QUESTIONS_SLOT = '{questions_block}'
+
+
+def _loads(text):
+    """JSON-decode with orjson when installed, the standard library otherwise"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def read_question_file(filepath, arrow_dtypes=False):
+    """
+    Read a question CSV/Excel/ODS file with the fastest reader available.
+
+    Args:
+        filepath (str): Path to the file
+        arrow_dtypes (bool): Keep Arrow-backed columns from the PyArrow CSV
+            reader. Only for read-only use: empty columns come back as
+            null[pyarrow], which rejects the values apply_and_export writes.
+
+    Returns:
+        DataFrame: File contents
+    """
+    if filepath.endswith('.csv'):
+        if PYARROW_AVAILABLE:
+            try:
+                if arrow_dtypes:
+                    return pd.read_csv(filepath, engine='pyarrow', dtype_backend='pyarrow')
+                # Missing strings come back as None; make them NaN like the C parser
+                return pd.read_csv(filepath, engine='pyarrow').fillna(np.nan)
+            except Exception:
+                pass  # fall back to the C parser
+        return pd.read_csv(filepath)
+    if CALAMINE_AVAILABLE:
+        try:
+            return pd.read_excel(filepath, engine='calamine')
+        except Exception:
+            pass  # fall back to odf/openpyxl
+    if filepath.endswith('.ods'):
+        return pd.read_excel(filepath, engine='odf')
+    return pd.read_excel(filepath, engine='openpyxl')
+
+
+def write_xlsx(df, output_path, sheet_name):
+    """
+    Write a DataFrame to a single-sheet workbook.
+
+    With xlsxwriter, rows go through a constant_memory workbook, which flushes
+    each row to disk once the next one starts. The rows are written directly
+    rather than through DataFrame.to_excel, which fills the sheet column by
+    column and would lose data in that mode. Falls back to openpyxl.
+    """
+    if not XLSXWRITER_AVAILABLE:
+        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+        return
+
+    # Python scalars, with missing values as blank cells
+    values = df.astype(object).where(df.notna(), None)
+
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], workbook.add_format({'bold': True}))
+        for row_num, row in enumerate(values.itertuples(index=False, name=None), 1):
+            worksheet.write_row(row_num, 0, row)
+    finally:
+        workbook.close()
+
+
+class ResponseCache:
+    """Parsed batch responses keyed by (deployment, prompt), stored in SQLite"""
+
+    def __init__(self, path, ttl=RESPONSE_CACHE_TTL):
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS batch_responses "
+                "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM batch_responses WHERE created < ?", (time.time() - self.ttl,))
+
+    @staticmethod
+    def key(deployment, prompt):
+        """Cache key for a prompt sent to a deployment (system prompt included)"""
+        text = f"{deployment}|{SYSTEM_PROMPT}|{prompt}"
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get_many(self, keys):
+        """
+        Returns:
+            dict: {key: parsed response} for the keys that are cached
+        """
+        keys = list(keys)
+        oldest = time.time() - self.ttl
+        rows = []
+        with self._lock:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows += self._conn.execute(
+                    f"SELECT key, response FROM batch_responses WHERE key IN ({placeholders}) AND created >= ?",
+                    chunk + [oldest]
+                ).fetchall()
+        return {key: _loads(response) for key, response in rows}
+
+    def put_many(self, items):
+        """Store (key, parsed response) pairs"""
+        now = time.time()
+        rows = [(key, json.dumps(response), now) for key, response in items]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO batch_responses VALUES (?, ?, ?)", rows)
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM batch_responses")
 
 
 class ObjectivesEngine:
@@ -34,11 +288,20 @@ class ObjectivesEngine:
                 'api_key': str,
                 'azure_endpoint': str,
                 'api_version': str,
-                'deployment': str
+                'deployment': str,
+                'max_concurrency': int (optional, default 8),
+                'response_cache': str (optional SQLite path, e.g.
+                    RESPONSE_CACHE_PATH; caching is off without it)
             }
         """
         self.config = config
         self.client = None
+        self.max_concurrency = config.get('max_concurrency') or MAX_CONCURRENCY
+        cache_path = config.get('response_cache')
+        self._response_cache = ResponseCache(cache_path) if cache_path else None
+        self._objectives_block = self._build_objectives_list()
+        self._map_prompt_parts = self._prompt_parts(MAP_PROMPT)
+        self._rate_prompt_parts = self._prompt_parts(RATE_PROMPT)
         self._initialize_client()
 
     def _initialize_client(self):
@@ -49,6 +312,202 @@ class ObjectivesEngine:
             api_version=self.config["api_version"]
         )
 
+    def _async_client(self):
+        """
+        Async client for one batch run.
+
+        Created per run: its connection pool is bound to the event loop that
+        asyncio.run starts (and closes) for that run. The SDK's own retries
+        are off; _complete_json retries with backoff instead.
+        """
+        return AsyncAzureOpenAI(
+            api_key=self.config["api_key"],
+            azure_endpoint=self.config["azure_endpoint"],
+            api_version=self.config["api_version"],
+            max_retries=0
+        )
+
+    def _chat_body(self, prompt, max_tokens):
+        """JSON-mode chat completion request for a batch prompt"""
+        return {
+            "model": self.config["deployment"],
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": max_tokens,
+            "response_format": {"type": "json_object"}
+        }
+
+    async def _stream_completion(self, client, prompt, max_tokens):
+        """
+        Stream one JSON-mode chat completion and return it parsed. With ijson
+        each delta is parsed on arrival, so the document is already built
+        when the last token lands; otherwise the text is parsed at the end.
+        """
+        stream = await client.chat.completions.create(**self._chat_body(prompt, max_tokens), stream=True)
+        if IJSON_AVAILABLE:
+            documents = ijson.sendable_list()
+            parser = ijson.items_coro(documents, '', use_float=True)
+        parts = []
+        async for chunk in stream:
+            # Azure's first chunk carries content-filter results and no choices
+            if chunk.choices and chunk.choices[0].delta.content:
+                if IJSON_AVAILABLE:
+                    parser.send(chunk.choices[0].delta.content.encode())
+                else:
+                    parts.append(chunk.choices[0].delta.content)
+        if IJSON_AVAILABLE:
+            parser.close()
+            return documents[0]
+        return _loads(''.join(parts).strip())
+
+    async def _complete_json(self, client, semaphore, prompt, max_tokens):
+        """
+        One batch prompt, parsed. Transient errors are retried with backoff
+        while holding the semaphore slot, so retries stay within
+        max_concurrency instead of adding to the load that caused them.
+        """
+        async with semaphore:
+            for attempt in range(RETRY_ATTEMPTS):
+                try:
+                    return await self._stream_completion(client, prompt, max_tokens)
+                except TRANSIENT_ERRORS:
+                    if attempt == RETRY_ATTEMPTS - 1:
+                        raise
+                    await asyncio.sleep(random.uniform(RETRY_MIN_WAIT, min(RETRY_MAX_WAIT, RETRY_MIN_WAIT * 2 ** attempt)))
+
+    async def _gather_prompts(self, prompts, max_tokens):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._async_client() as client:
+            return await asyncio.gather(
+                *(self._complete_json(client, semaphore, prompt, max_tokens) for prompt in prompts),
+                return_exceptions=True
+            )
+
+    def _run_prompts(self, prompts, max_tokens):
+        """
+        Send batch prompts concurrently, at most max_concurrency in flight.
+
+        Args:
+            prompts (list): One prompt per batch
+            max_tokens (int): Completion token limit per batch
+
+        Returns:
+            list: Parsed JSON response per prompt (same order), or the
+                exception that prompt failed with
+        """
+        if not prompts:
+            return []
+        return asyncio.run(self._gather_prompts(prompts, max_tokens))
+
+    def _run_prompts_batch(self, prompts, max_tokens):
+        """
+        Send batch prompts as one Azure OpenAI Batch API job: upload a JSONL
+        file, poll until the job finishes, then collect its output file.
+        Half the cost of live requests, but completes within a 24h window,
+        so only for non-interactive bulk runs. Needs a batch deployment and
+        an API version that supports batches.
+
+        Args:
+            prompts (list): One prompt per batch
+            max_tokens (int): Completion token limit per batch
+
+        Returns:
+            list: Parsed JSON response per prompt (same order), or the
+                exception that prompt failed with
+        """
+        if not prompts:
+            return []
+
+        lines = [
+            json.dumps({
+                "custom_id": f"batch_{i}",
+                "method": "POST",
+                "url": "/chat/completions",
+                "body": self._chat_body(prompt, max_tokens)
+            })
+            for i, prompt in enumerate(prompts)
+        ]
+        input_file = self.client.files.create(
+            file=("batch_input.jsonl", "\n".join(lines).encode('utf-8')),
+            purpose="batch"
+        )
+        job = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/chat/completions",
+            completion_window="24h"
+        )
+        print(f"  [...] Batch job {job.id} submitted ({len(prompts)} requests)")
+
+        while job.status not in ('completed', 'failed', 'expired', 'cancelled'):
+            time.sleep(BATCH_POLL_INTERVAL)
+            job = self.client.batches.retrieve(job.id)
+
+        if job.status != 'completed':
+            raise RuntimeError(f"Batch job {job.id} {job.status}")
+
+        # Output lines come back in completion order, not submission order
+        results = [RuntimeError('No result in batch output')] * len(prompts)
+        if job.output_file_id:
+            output = self.client.files.content(job.output_file_id).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                record = _loads(line)
+                idx = int(record['custom_id'].rsplit('_', 1)[1])
+                response = record.get('response') or {}
+                try:
+                    if record.get('error') or response.get('status_code') != 200:
+                        raise RuntimeError(record.get('error') or response.get('body'))
+                    content = response['body']['choices'][0]['message']['content']
+                    results[idx] = _loads(content.strip())
+                except Exception as e:
+                    results[idx] = e
+        return results
+
+    def clear_response_cache(self):
+        """Forget all cached batch responses (no-op when caching is off)"""
+        if self._response_cache is not None:
+            self._response_cache.clear()
+
+    def _run_cached(self, run_prompts, prompts, max_tokens, result_key, batch_sizes):
+        """
+        Run batch prompts through run_prompts, answering repeats from the
+        response cache. A fresh response is cached only when it is complete:
+        its result_key list has one entry per question in the batch, so a
+        truncated or refused reply is retried on the next run, not replayed.
+
+        Args:
+            result_key (str): 'mappings' or 'ratings'
+            batch_sizes (list): Questions in each prompt's batch
+
+        Returns:
+            list: Parsed JSON response per prompt (same order), or the
+                exception that prompt failed with
+        """
+        if self._response_cache is None:
+            return run_prompts(prompts, max_tokens)
+
+        keys = [ResponseCache.key(self.config["deployment"], prompt) for prompt in prompts]
+        cached = self._response_cache.get_many(set(keys))
+        misses = [i for i, key in enumerate(keys) if key not in cached]
+        if cached:
+            print(f"  [CACHE] {len(prompts) - len(misses)}/{len(prompts)} batches from cache")
+
+        fresh = run_prompts([prompts[i] for i in misses], max_tokens)
+        self._response_cache.put_many(
+            (keys[i], result) for i, result in zip(misses, fresh)
+            if isinstance(result, dict) and isinstance(result.get(result_key), list)
+            and len(result[result_key]) == batch_sizes[i]
+        )
+
+        results = [cached.get(key) for key in keys]
+        for i, result in zip(misses, fresh):
+            results[i] = result
+        return results
+
     def test_connection(self):
         """Test Azure OpenAI connection"""
         try:
@@ -62,6 +521,25 @@ class ObjectivesEngine:
             print(f"[ERROR] Connection Failed: {e}")
             return False
 
+    @staticmethod
+    def _select_questions(df):
+        """
+        Question numbers and texts of a question sheet, with the mask of rows
+        to send to the model (not a stem, non-empty text).
+
+        Returns:
+            tuple: (q_nums, q_texts, mask) Series aligned to df.index;
+                q_nums defaults to Q1, Q2, ... when the column is missing
+        """
+        if 'Question Number' in df.columns:
+            q_nums = df['Question Number'].astype(str)
+        else:
+            q_nums = 'Q' + pd.Series(df.index + 1, index=df.index).astype(str)
+        q_texts = df['Question Text'] if 'Question Text' in df.columns else pd.Series('', index=df.index)
+
+        mask = ~q_nums.str.contains('(Stem)', regex=False) & q_texts.fillna('').astype(bool)
+        return q_nums, q_texts, mask
+
     def _build_objectives_list(self):
         """Build formatted objectives list for prompts"""
         return "\n".join([
@@ -69,17 +547,31 @@ class ObjectivesEngine:
             for obj_id, desc in OBJECTIVES_REFERENCE.items()
         ])
 
+    def _prompt_parts(self, template):
+        """
+        Render a prompt template once with the objectives list, split around
+        its questions slot so each batch only concatenates its questions in.
+
+        Returns:
+            tuple: (text before the questions, text after them)
+        """
+        rendered = template.format(questions_block=QUESTIONS_SLOT, objectives=self._objectives_block)
+        head, tail = rendered.split(QUESTIONS_SLOT)
+        return head, tail
+
     # ========================================
     # TOOL 1: Map Unmapped Questions
     # ========================================
 
-    def map_questions(self, question_csv, batch_size=5):
+    def map_questions(self, question_csv, batch_size=BATCH_SIZE, use_batch_api=False):
         """
         Tool 1: Map unmapped questions to objectives
 
         Args:
             question_csv (str): Path to question CSV
             batch_size (int): Questions per API call
+            use_batch_api (bool): Submit as one Batch API job instead of
+                live requests (cheaper, but may take hours)
 
         Returns:
             dict: {
@@ -88,102 +580,60 @@ class ObjectivesEngine:
                 'gaps': [...]
             }
         """
-        questions_df = pd.read_csv(question_csv)
+        questions_df = read_question_file(question_csv)
 
         # Prepare questions (skip stems)
-        questions_list = []
-        for idx, row in questions_df.iterrows():
-            q_num = str(row.get('Question Number', f"Q{idx+1}"))
-            q_text = row.get('Question Text', '')
-
-            if '(Stem)' in q_num:
-                continue
-            if q_text and pd.notna(q_text):
-                questions_list.append((q_num, q_text))
+        q_nums, q_texts, mask = self._select_questions(questions_df)
+        questions_list = list(zip(q_nums[mask], q_texts[mask]))
 
         recommendations = []
-        coverage_counts = {obj: 0 for obj in OBJECTIVES_REFERENCE.keys()}
-
-        # Process in batches
-        total_batches = (len(questions_list) + batch_size - 1) // batch_size
-        print(f"[MAP] Processing {len(questions_list)} questions in {total_batches} batches")
-
-        for batch_idx in range(0, len(questions_list), batch_size):
-            batch = questions_list[batch_idx:batch_idx + batch_size]
-            current_batch = (batch_idx // batch_size) + 1
-            print(f"  [...] Batch {current_batch}/{total_batches}")
-
-            # Build batch prompt
-            questions_block = "\n\n".join([
-                f"[{q_num}]: {q_text}"
-                for q_num, q_text in batch
-            ])
-
-            prompt = f"""You are a medical education curriculum mapping expert.
-
-Map EACH question to the most appropriate Learning Objective.
-
-QUESTIONS:
-{questions_block}
-
-AVAILABLE OBJECTIVES:
-{self._build_objectives_list()}
-
-Respond in JSON format:
-{{
-    "mappings": [
-        {{
-            "question_id": "...",
-            "objective_id": "O1-O6",
-            "confidence": 0.XX,
-            "reason": "Brief one-line explanation"
-        }}
-    ]
-}}
-
-Rules:
-- Map each question to exactly ONE objective (O1-O6)
-- Confidence: 0.0-1.0 (how certain you are)
-- Reason: Keep to one brief sentence
-"""
-
+        coverage_counts = dict(ZERO_COVERAGE)
+
+        # Send each distinct question text once; its mapping is copied to
+        # every question with the same text
+        unique_questions = {}
+        for q_num, q_text in questions_list:
+            unique_questions.setdefault(q_text, (q_num, q_text))
+        unique_questions = list(unique_questions.values())
+
+        # Process in batches, sent concurrently
+        batches = [unique_questions[i:i + batch_size] for i in range(0, len(unique_questions), batch_size)]
+        print(f"[MAP] Processing {len(questions_list)} questions ({len(unique_questions)} unique) "
+              f"in {len(batches)} batches (up to {self.max_concurrency} at a time)")
+
+        run_prompts = self._run_prompts_batch if use_batch_api else self._run_prompts
+        results = self._run_cached(run_prompts, [self._map_prompt(batch) for batch in batches], MAX_TOKENS,
+                                   'mappings', [len(batch) for batch in batches])
+
+        mapped = {}  # question text -> mapping fields
+        for current_batch, (batch, batch_response) in enumerate(zip(batches, results), 1):
             try:
-                response = self.client.chat.completions.create(
-                    model=self.config["deployment"],
-                    messages=[
-                        {"role": "system", "content": "You are a medical education expert. Respond with valid JSON only."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=1500,
-                    response_format={"type": "json_object"}
-                )
-
-                content = response.choices[0].message.content.strip()
-                batch_response = json.loads(content)
+                if isinstance(batch_response, Exception):
+                    raise batch_response
                 mappings = batch_response.get('mappings', [])
 
                 for i, mapping in enumerate(mappings):
                     if i < len(batch):
-                        q_num, q_text = batch[i]
+                        q_text = batch[i][1]
                         obj_id = mapping.get('objective_id', 'O1')
 
-                        if obj_id in coverage_counts:
-                            coverage_counts[obj_id] += 1
-
-                        recommendations.append({
-                            'question_num': q_num,
+                        mapped[q_text] = {
                             'question_text': q_text[:150] + '...' if len(q_text) > 150 else q_text,
                             'objective_id': obj_id,
                             'objective_desc': OBJECTIVES_REFERENCE.get(obj_id, ''),
                             'confidence': mapping.get('confidence', 0.0),
                             'reason': mapping.get('reason', '')
-                        })
+                        }
 
             except Exception as e:
                 print(f"  [ERROR] Batch {current_batch} failed: {e}")
 
-            time.sleep(1.0)
+        for q_num, q_text in questions_list:
+            if q_text in mapped:
+                recommendation = {'question_num': q_num, **mapped[q_text]}
+                if recommendation['objective_id'] in coverage_counts:
+                    coverage_counts[recommendation['objective_id']] += 1
+                recommendations.append(recommendation)
 
         # Identify gaps
         gaps = [obj for obj, count in coverage_counts.items() if count == 0]
@@ -198,17 +648,29 @@ Rules:
             'mapped_questions': len(recommendations)
         }
 
+    def _map_prompt(self, batch):
+        """Mapping prompt for a batch of (question number, text) pairs"""
+        questions_block = "\n\n".join([
+            f"[{q_num}]: {q_text}"
+            for q_num, q_text in batch
+        ])
+
+        head, tail = self._map_prompt_parts
+        return head + questions_block + tail
+
     # ========================================
     # TOOL 2: Rate Existing Mappings
     # ========================================
 
-    def rate_mappings(self, mapped_file, batch_size=5):
+    def rate_mappings(self, mapped_file, batch_size=BATCH_SIZE, use_batch_api=False):
         """
         Tool 2: Rate existing objective mappings
 
         Args:
             mapped_file (str): Path to file with existing mappings
             batch_size (int): Questions per API call
+            use_batch_api (bool): Submit as one Batch API job instead of
+                live requests (cheaper, but may take hours)
 
         Returns:
             dict: {
@@ -218,101 +680,48 @@ Rules:
             }
         """
         # Load mapped file
-        if mapped_file.endswith('.csv'):
-            mapped_df = pd.read_csv(mapped_file)
-        elif mapped_file.endswith('.ods'):
-            mapped_df = pd.read_excel(mapped_file, engine='odf')
-        else:
-            mapped_df = pd.read_excel(mapped_file, engine='openpyxl')
+        mapped_df = read_question_file(mapped_file)
 
         # Prepare questions with existing mappings
-        questions_list = []
-        for idx, row in mapped_df.iterrows():
-            q_num = str(row.get('Question Number', f"Q{idx+1}"))
-
-            if '(Stem)' in q_num:
-                continue
-
-            q_text = row.get('Question Text', '')
-            if not q_text or pd.isna(q_text):
-                continue
-
-            # Get existing objective mapping
-            existing_obj = row.get('mapped_objective', row.get('objective_id', row.get('Objective', '')))
-            if pd.isna(existing_obj):
-                existing_obj = ''
-
-            questions_list.append((q_num, q_text, str(existing_obj).strip()))
+        q_nums, q_texts, mask = self._select_questions(mapped_df)
+        existing_col = next((col for col in ('mapped_objective', 'objective_id', 'Objective')
+                             if col in mapped_df.columns), None)
+        if existing_col:
+            existing = mapped_df[existing_col].fillna('').astype(str).str.strip()
+        else:
+            existing = pd.Series('', index=mapped_df.index)
+        questions_list = list(zip(q_nums[mask], q_texts[mask], existing[mask]))
 
         all_ratings = []
 
-        # Process in batches
-        total_batches = (len(questions_list) + batch_size - 1) // batch_size
-        print(f"[RATE] Rating {len(questions_list)} mappings in {total_batches} batches")
-
-        for batch_idx in range(0, len(questions_list), batch_size):
-            batch = questions_list[batch_idx:batch_idx + batch_size]
-            current_batch = (batch_idx // batch_size) + 1
-            print(f"  [...] Batch {current_batch}/{total_batches}")
+        # Rate each distinct (question text, current mapping) pair once; the
+        # rating is copied to every question that shares it
+        unique_questions = {}
+        for q_num, q_text, existing in questions_list:
+            unique_questions.setdefault((q_text, existing), (q_num, q_text, existing))
+        unique_questions = list(unique_questions.values())
 
-            questions_block = "\n\n".join([
-                f"[{q_num}]\nQuestion: {q_text}\nCurrent Mapping: {existing}"
-                for q_num, q_text, existing in batch
-            ])
+        # Process in batches, sent concurrently
+        batches = [unique_questions[i:i + batch_size] for i in range(0, len(unique_questions), batch_size)]
+        print(f"[RATE] Rating {len(questions_list)} mappings ({len(unique_questions)} unique) "
+              f"in {len(batches)} batches (up to {self.max_concurrency} at a time)")
 
-            prompt = f"""You are a medical education curriculum mapping expert.
-
-TASK: Evaluate existing objective mappings. Rate each and suggest better if needed.
-
-QUESTIONS WITH CURRENT MAPPINGS:
-{questions_block}
-
-AVAILABLE OBJECTIVES:
-{self._build_objectives_list()}
-
-Respond in JSON format:
-{{
-    "ratings": [
-        {{
-            "question_id": "...",
-            "rating": "correct" | "partially_correct" | "incorrect",
-            "agreement_score": 0.XX,
-            "rating_reason": "Brief explanation",
-            "suggested_objective": "O1-O6",
-            "suggestion_confidence": 0.XX,
-            "suggestion_reason": "Why this is better (if different)"
-        }}
-    ]
-}}
-
-Rules:
-- rating: "correct" if mapping is accurate, "partially_correct" if somewhat related, "incorrect" if wrong
-- agreement_score: 1.0 = perfect match, 0.0 = completely wrong
-- If current is correct, suggested_objective should match current
-"""
+        run_prompts = self._run_prompts_batch if use_batch_api else self._run_prompts
+        results = self._run_cached(run_prompts, [self._rate_prompt(batch) for batch in batches], MAX_TOKENS,
+                                   'ratings', [len(batch) for batch in batches])
 
+        rated = {}  # (question text, current mapping) -> rating fields
+        for current_batch, (batch, batch_response) in enumerate(zip(batches, results), 1):
             try:
-                response = self.client.chat.completions.create(
-                    model=self.config["deployment"],
-                    messages=[
-                        {"role": "system", "content": "You are a medical education expert. Respond with valid JSON only."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=2000,
-                    response_format={"type": "json_object"}
-                )
-
-                content = response.choices[0].message.content.strip()
-                batch_response = json.loads(content)
+                if isinstance(batch_response, Exception):
+                    raise batch_response
                 ratings = batch_response.get('ratings', [])
 
                 for i, rating in enumerate(ratings):
                     if i < len(batch):
-                        q_num, q_text, existing = batch[i]
+                        _, q_text, existing = batch[i]
 
-                        all_ratings.append({
-                            'question_num': q_num,
+                        rated[(q_text, existing)] = {
                             'question_text': q_text[:150] + '...' if len(q_text) > 150 else q_text,
                             'current_objective': existing,
                             'rating': rating.get('rating', 'unknown'),
@@ -322,12 +731,14 @@ Rules:
                             'suggested_desc': OBJECTIVES_REFERENCE.get(rating.get('suggested_objective', ''), ''),
                             'suggestion_confidence': rating.get('suggestion_confidence', 0.0),
                             'suggestion_reason': rating.get('suggestion_reason', '')
-                        })
+                        }
 
             except Exception as e:
                 print(f"  [ERROR] Batch {current_batch} failed: {e}")
 
-            time.sleep(1.0)
+        for q_num, q_text, existing in questions_list:
+            if (q_text, existing) in rated:
+                all_ratings.append({'question_num': q_num, **rated[(q_text, existing)]})
 
         # Generate summary
         correct = sum(1 for r in all_ratings if r['rating'] == 'correct')
@@ -355,6 +766,16 @@ Rules:
             'recommendations': recommendations
         }
 
+    def _rate_prompt(self, batch):
+        """Rating prompt for a batch of (question number, text, current mapping) triples"""
+        questions_block = "\n\n".join([
+            f"[{q_num}]\nQuestion: {q_text}\nCurrent Mapping: {existing}"
+            for q_num, q_text, existing in batch
+        ])
+
+        head, tail = self._rate_prompt_parts
+        return head + questions_block + tail
+
     # ========================================
     # TOOL 3: Generate Insights Data
     # ========================================
@@ -370,29 +791,36 @@ Rules:
             dict: Data for visualization
         """
         # Load mapped file
-        if mapped_file.endswith('.csv'):
-            df = pd.read_csv(mapped_file)
-        elif mapped_file.endswith('.ods'):
-            df = pd.read_excel(mapped_file, engine='odf')
-        else:
-            df = pd.read_excel(mapped_file, engine='openpyxl')
-
-        # Count coverage per objective
-        coverage = {obj: 0 for obj in OBJECTIVES_REFERENCE.keys()}
-        confidence_scores = []
+        df = read_question_file(mapped_file)
 
-        for idx, row in df.iterrows():
-            q_num = str(row.get('Question Number', ''))
-            if '(Stem)' in q_num:
-                continue
-
-            obj = row.get('objective_id', row.get('mapped_objective', row.get('Objective', '')))
-            if pd.notna(obj) and str(obj).strip() in coverage:
-                coverage[str(obj).strip()] += 1
-
-            conf = row.get('confidence', row.get('confidence_score', 0.85))
-            if pd.notna(conf):
-                confidence_scores.append(float(conf))
+        # Count coverage per objective: map each question's objective to its
+        # index in OBJECTIVES_REFERENCE and tally with one bincount
+        objective_ids = list(OBJECTIVES_REFERENCE.keys())
+        if 'Question Number' in df.columns:
+            questions = df[~df['Question Number'].astype(str).str.contains('(Stem)', regex=False)]
+        else:
+            questions = df
+
+        # Each question's objective is its first filled objective column, so
+        # a sheet with both source and exported columns counts every row
+        objective_cols = [col for col in ('objective_id', 'mapped_objective', 'Objective')
+                          if col in questions.columns]
+        if objective_cols:
+            objectives = questions[objective_cols].bfill(axis=1).iloc[:, 0].dropna().astype(str).str.strip()
+            topic_idx = pd.Categorical(objectives, categories=objective_ids).codes.astype(np.intp)
+            topic_idx = topic_idx[topic_idx >= 0]
+        else:
+            topic_idx = np.empty(0, dtype=np.intp)
+        coverage = dict(zip(objective_ids, np.bincount(topic_idx, minlength=len(objective_ids)).tolist()))
+
+        # Confidence per question; files without a confidence column count
+        # every question at the default 0.85
+        confidence_col = next((col for col in ('confidence', 'confidence_score')
+                               if col in questions.columns), None)
+        if confidence_col:
+            confidence_scores = questions[confidence_col].dropna().astype(float).tolist()
+        else:
+            confidence_scores = [0.85] * len(questions)
 
         # Identify gaps
         gaps = [obj for obj, count in coverage.items() if count == 0]
@@ -401,7 +829,7 @@ Rules:
             'coverage': coverage,
             'confidence_scores': confidence_scores,
             'gaps': gaps,
-            'total_questions': len([1 for _, r in df.iterrows() if '(Stem)' not in str(r.get('Question Number', ''))]),
+            'total_questions': len(questions),
             'objectives_reference': OBJECTIVES_REFERENCE
         }
 
@@ -409,7 +837,8 @@ Rules:
     # Export Functions
     # ========================================
 
-    def apply_and_export(self, question_csv, recommendations, selected_indices, output_folder):
+    def apply_and_export(self, question_csv, recommendations, selected_indices, output_folder,
+                         output_format='xlsx'):
         """
         Apply selected mappings and export to Excel
 
@@ -418,28 +847,40 @@ Rules:
             recommendations (list): All recommendations
             selected_indices (list): Indices to apply
             output_folder (str): Output directory
+            output_format (str): 'xlsx', or 'csv' for a faster, unformatted export
 
         Returns:
-            str: Path to output Excel file
+            str: Path to output file
         """
-        df = pd.read_csv(question_csv)
-
-        for idx in selected_indices:
-            if idx < len(recommendations):
-                rec = recommendations[idx]
-                q_num = rec['question_num']
-
-                mask = df['Question Number'].astype(str) == str(q_num)
-                df.loc[mask, 'mapped_objective'] = rec.get('objective_id', '')
-                df.loc[mask, 'objective_description'] = rec.get('objective_desc', rec.get('suggested_desc', ''))
-                df.loc[mask, 'confidence_score'] = rec.get('confidence', rec.get('suggestion_confidence', 0.0))
-                df.loc[mask, 'mapping_reason'] = rec.get('reason', rec.get('suggestion_reason', ''))
+        if output_format not in ('xlsx', 'csv'):
+            raise ValueError(f"Unsupported output format: {output_format}")
+
+        df = read_question_file(question_csv)
+
+        # One row of new values per selected question (a later selection of
+        # the same question wins), applied to the sheet in one pass per column
+        selected = [recommendations[idx] for idx in selected_indices if idx < len(recommendations)]
+        if selected:
+            updates = pd.DataFrame({
+                'mapped_objective': [rec.get('objective_id', '') for rec in selected],
+                'objective_description': [rec.get('objective_desc', rec.get('suggested_desc', '')) for rec in selected],
+                'confidence_score': [rec.get('confidence', rec.get('suggestion_confidence', 0.0)) for rec in selected],
+                'mapping_reason': [rec.get('reason', rec.get('suggestion_reason', '')) for rec in selected]
+            }, index=[str(rec['question_num']) for rec in selected])
+            updates = updates[~updates.index.duplicated(keep='last')]
+
+            q_nums = df['Question Number'].astype(str)
+            matched = q_nums.isin(updates.index)
+            for col in updates.columns:
+                df.loc[matched, col] = q_nums[matched].map(updates[col])
 
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_filename = f"objectives_mapping_{timestamp}.xlsx"
+        output_filename = f"objectives_mapping_{timestamp}.{output_format}"
         output_path = os.path.join(output_folder, output_filename)
 
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Objectives Mapping', index=False)
+        if output_format == 'csv':
+            df.to_csv(output_path, index=False)
+        else:
+            write_xlsx(df, output_path, 'Objectives Mapping')
 
         return output_path
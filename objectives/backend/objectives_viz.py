@@ -6,8 +6,16 @@ Generates charts for Learning Objectives (O1-O6) mapping insights
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
+import multiprocessing
+import numpy as np
 import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 
 
@@ -21,6 +29,119 @@ OBJECTIVES_REFERENCE = {
     'O6': 'Prophylaxis for infections'
 }
 
+OBJECTIVE_COLORS = {
+    'O1': '#00a8cc',
+    'O2': '#00d4aa',
+    'O3': '#ffa600',
+    'O4': '#ff6b6b',
+    'O5': '#845ec2',
+    'O6': '#4b8bbe'
+}
+
+# Per-objective chart labels and colors never change: build them once
+_OBJ_KEYS = tuple(OBJECTIVES_REFERENCE)
+_BAR_LABELS = tuple(f"{obj}\n{OBJECTIVES_REFERENCE[obj][:30]}..." for obj in _OBJ_KEYS)
+_LEGEND_LABELS = {obj: f"{obj}: {OBJECTIVES_REFERENCE[obj][:35]}..." for obj in _OBJ_KEYS}
+_GAP_DESCRIPTIONS = tuple(OBJECTIVES_REFERENCE[obj][:40] + '...' for obj in _OBJ_KEYS)
+_COLOR_LIST = tuple(OBJECTIVE_COLORS[obj] for obj in _OBJ_KEYS)
+
+
+def _counts(coverage_data):
+    """Questions per objective as an array, in OBJECTIVES_REFERENCE order"""
+    return np.fromiter((coverage_data.get(obj, 0) for obj in _OBJ_KEYS),
+                       dtype=np.int64, count=len(_OBJ_KEYS))
+
+
+# Chart renders run in parallel worker processes, one chart per worker
+CHART_WORKERS = min(5, os.cpu_count() or 1)
+
+# Simplify long paths and draw them in chunks
+matplotlib.rcParams['path.simplify'] = True
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+
+# Fast zlib level: PNG encode dominates the render at dpi=150
+PNG_PIL_KWARGS = {'compress_level': 1}
+
+# Reusable figures per thread. Module level rather than on the engine: the
+# engine is pickled afresh into a worker for every chart task.
+_figures = threading.local()
+
+
+def _figure(figsize, layout='constrained'):
+    """
+    A cleared Figure of the given size, reused across charts in this thread.
+
+    Built on FigureCanvasAgg directly rather than through pyplot, so there
+    is no global figure registry to add to and close. Constrained layout
+    sizes the margins in the same draw as the save, so no tight_layout
+    pass and no bbox_inches='tight' re-render.
+    """
+    figures = getattr(_figures, 'by_size', None)
+    if figures is None:
+        figures = _figures.by_size = {}
+
+    fig = figures.get((figsize, layout))
+    if fig is None:
+        fig = Figure(figsize=figsize, layout=layout)
+        FigureCanvasAgg(fig)
+        figures[(figsize, layout)] = fig
+    else:
+        fig.clear()
+    return fig
+
+
+def _init_chart_worker(rc):
+    """Give a chart worker process the parent's style and rcParams"""
+    matplotlib.rcParams.update(rc)
+
+
+# One chart pool per process, shared by every engine and kept across requests
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _chart_pool():
+    """
+    The process-wide chart worker pool, created on first use with the
+    rcParams current at that point (the style sheet).
+
+    Workers are forked, so they start with matplotlib already imported.
+    forkserver/spawn workers would instead re-run the __main__ module, which
+    for app.py means its whole engine setup and Azure connection test.
+    spawn is used only where fork is unavailable.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+            rc = {key: value for key, value in matplotlib.rcParams.items() if key != 'backend'}
+            _pool = ProcessPoolExecutor(max_workers=CHART_WORKERS,
+                                        mp_context=multiprocessing.get_context(start_method),
+                                        initializer=_init_chart_worker, initargs=(rc,))
+        return _pool
+
+
+def _discard_chart_pool(broken):
+    """
+    Drop a pool whose worker died (OOM kill, segfault), so the next
+    _chart_pool() call builds a fresh one. Only that pool is dropped: another
+    thread may already have replaced it.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def warm_chart_pool():
+    """
+    Start the chart workers now rather than on the first insights request.
+    Call from the main thread before serving, so the workers are forked
+    before the server starts its request threads.
+    """
+    _chart_pool().submit(int).result()
+
 
 class ObjectivesVizEngine:
     """Generates visualization charts for Objectives mapping"""
@@ -30,14 +151,15 @@ class ObjectivesVizEngine:
         os.makedirs(output_folder, exist_ok=True)
 
         plt.style.use('seaborn-v0_8-whitegrid')
-        self.colors = {
-            'O1': '#00a8cc',
-            'O2': '#00d4aa',
-            'O3': '#ffa600',
-            'O4': '#ff6b6b',
-            'O5': '#845ec2',
-            'O6': '#4b8bbe'
-        }
+        self.colors = OBJECTIVE_COLORS
+
+    def _save(self, fig, prefix):
+        """Write a chart figure to a timestamped PNG in the output folder"""
+        # Unique per call: concurrent requests render into the same folder
+        filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}.png"
+        filepath = os.path.join(self.output_folder, filename)
+        fig.savefig(filepath, dpi=150, pil_kwargs=PNG_PIL_KWARGS)
+        return filepath
 
     def generate_coverage_bar_chart(self, coverage_data):
         """
@@ -49,14 +171,12 @@ class ObjectivesVizEngine:
         Returns:
             str: Path to saved PNG
         """
-        fig, ax = plt.subplots(figsize=(12, 6))
+        fig = _figure((12, 6))
+        ax = fig.subplots()
 
-        objectives = list(OBJECTIVES_REFERENCE.keys())
-        counts = [coverage_data.get(obj, 0) for obj in objectives]
-        labels = [f"{obj}\n{OBJECTIVES_REFERENCE[obj][:30]}..." for obj in objectives]
-        colors = [self.colors[obj] for obj in objectives]
+        counts = _counts(coverage_data)
 
-        bars = ax.bar(labels, counts, color=colors, edgecolor='white', linewidth=2)
+        bars = ax.bar(_BAR_LABELS, counts, color=_COLOR_LIST, edgecolor='white', linewidth=2)
 
         # Add count labels
         for bar, count in zip(bars, counts):
@@ -65,17 +185,11 @@ class ObjectivesVizEngine:
 
         ax.set_ylabel('Number of Questions', fontsize=12)
         ax.set_title('Questions per Learning Objective', fontsize=16, fontweight='bold', pad=20)
-        ax.set_ylim(0, max(counts) * 1.2 if counts else 10)
+        ax.set_ylim(0, counts.max() * 1.2)
 
-        plt.xticks(rotation=0, fontsize=10)
-        plt.tight_layout()
+        ax.tick_params(axis='x', labelrotation=0, labelsize=10)
 
-        filename = f"objectives_coverage_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_folder, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-
-        return filepath
+        return self._save(fig, 'objectives_coverage')
 
     def generate_distribution_pie(self, coverage_data):
         """
@@ -87,12 +201,15 @@ class ObjectivesVizEngine:
         Returns:
             str: Path to saved PNG
         """
-        fig, ax = plt.subplots(figsize=(10, 8))
+        fig = _figure((10, 8))
+        ax = fig.subplots()
 
-        objectives = [obj for obj in OBJECTIVES_REFERENCE.keys() if coverage_data.get(obj, 0) > 0]
-        counts = [coverage_data[obj] for obj in objectives]
-        colors = [self.colors[obj] for obj in objectives]
-        total = sum(counts)
+        all_counts = _counts(coverage_data)
+        present = all_counts > 0
+        objectives = [obj for obj, keep in zip(_OBJ_KEYS, present) if keep]
+        counts = all_counts[present]
+        colors = [color for color, keep in zip(_COLOR_LIST, present) if keep]
+        total = int(counts.sum())
 
         # Donut chart
         wedges, texts, autotexts = ax.pie(
@@ -105,10 +222,9 @@ class ObjectivesVizEngine:
         )
 
         # Legend
-        legend_labels = [f"{obj}: {OBJECTIVES_REFERENCE[obj][:35]}... ({coverage_data.get(obj, 0)})"
-                         for obj in objectives]
-        ax.legend(wedges, legend_labels, title="Learning Objectives",
-                  loc="center left", bbox_to_anchor=(1, 0.5), fontsize=9)
+        legend_labels = [f"{_LEGEND_LABELS[obj]} ({count})" for obj, count in zip(objectives, counts)]
+        fig.legend(wedges, legend_labels, title="Learning Objectives",
+                   loc="outside right center", fontsize=9)
 
         ax.set_title('Objective Distribution', fontsize=16, fontweight='bold', pad=20)
 
@@ -116,14 +232,7 @@ class ObjectivesVizEngine:
         ax.text(0, 0, f'{total}\nQuestions', ha='center', va='center',
                 fontsize=18, fontweight='bold')
 
-        plt.tight_layout()
-
-        filename = f"objectives_distribution_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_folder, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-
-        return filepath
+        return self._save(fig, 'objectives_distribution')
 
     def generate_confidence_chart(self, confidence_scores):
         """
@@ -135,7 +244,8 @@ class ObjectivesVizEngine:
         Returns:
             str: Path to saved PNG
         """
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig = _figure((10, 6))
+        ax = fig.subplots()
 
         if not confidence_scores:
             confidence_scores = [0.85]
@@ -161,6 +271,7 @@ class ObjectivesVizEngine:
 
         ax.set_xlabel('Confidence Score', fontsize=12)
         ax.set_ylabel('Number of Mappings', fontsize=12)
+        ax.set_ylim(0, max(counts.max(), 1) * 1.3)  # headroom for count labels and stats
         ax.set_title('Mapping Confidence Distribution', fontsize=16, fontweight='bold', pad=20)
 
         # Legend
@@ -179,14 +290,7 @@ class ObjectivesVizEngine:
         ax.text(0.98, 0.98, stats, transform=ax.transAxes, ha='right', va='top',
                 fontsize=10, bbox=dict(boxstyle='round', facecolor='#f0f0f0', alpha=0.8))
 
-        plt.tight_layout()
-
-        filename = f"objectives_confidence_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_folder, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-
-        return filepath
+        return self._save(fig, 'objectives_confidence')
 
     def generate_gap_analysis(self, coverage_data):
         """
@@ -198,26 +302,18 @@ class ObjectivesVizEngine:
         Returns:
             str: Path to saved PNG
         """
-        fig, ax = plt.subplots(figsize=(12, 6))
-
-        objectives = list(OBJECTIVES_REFERENCE.keys())
-        counts = [coverage_data.get(obj, 0) for obj in objectives]
-        labels = [f"{obj}" for obj in objectives]
-
-        # Color by coverage level
-        colors = []
-        for count in counts:
-            if count == 0:
-                colors.append('#ff6b6b')  # Gap - Red
-            elif count <= 3:
-                colors.append('#ffa600')  # Low - Orange
-            else:
-                colors.append('#00d4aa')  # Good - Green
+        fig = _figure((12, 6))
+        ax = fig.subplots()
 
-        bars = ax.barh(labels, counts, color=colors, edgecolor='white', linewidth=2)
+        counts = _counts(coverage_data)
+
+        # Color by coverage level: Gap - Red, Low - Orange, Good - Green
+        colors = np.select([counts == 0, counts <= 3], ['#ff6b6b', '#ffa600'], '#00d4aa')
+
+        bars = ax.barh(_OBJ_KEYS, counts, color=colors, edgecolor='white', linewidth=2)
 
         # Add labels and descriptions
-        for i, (bar, count, obj) in enumerate(zip(bars, counts, objectives)):
+        for bar, count, description in zip(bars, counts, _GAP_DESCRIPTIONS):
             # Count or GAP label
             label = str(count) if count > 0 else 'GAP'
             color = 'black' if count > 0 else 'white'
@@ -226,13 +322,12 @@ class ObjectivesVizEngine:
                     label, va='center', fontsize=11, fontweight='bold', color=color)
 
             # Description on right
-            ax.text(max(counts) + 2, bar.get_y() + bar.get_height()/2,
-                    OBJECTIVES_REFERENCE[obj][:40] + '...',
-                    va='center', fontsize=9, color='#666666')
+            ax.text(counts.max() + 2, bar.get_y() + bar.get_height()/2,
+                    description, va='center', fontsize=9, color='#666666')
 
         ax.set_xlabel('Number of Questions', fontsize=12)
         ax.set_title('Curriculum Coverage & Gap Analysis', fontsize=16, fontweight='bold', pad=20)
-        ax.set_xlim(0, max(counts) + 15 if counts else 15)
+        ax.set_xlim(0, counts.max() + 15)
 
         # Legend
         from matplotlib.patches import Patch
@@ -243,14 +338,7 @@ class ObjectivesVizEngine:
         ]
         ax.legend(handles=legend_elements, loc='lower right')
 
-        plt.tight_layout()
-
-        filename = f"objectives_gaps_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_folder, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-
-        return filepath
+        return self._save(fig, 'objectives_gaps')
 
     def generate_summary_dashboard(self, coverage_data, confidence_scores):
         """
@@ -263,8 +351,8 @@ class ObjectivesVizEngine:
         Returns:
             str: Path to saved PNG
         """
-        fig = plt.figure(figsize=(16, 10))
-        fig.suptitle('Objectives Mapping Summary Dashboard', fontsize=20, fontweight='bold', y=0.98)
+        fig = _figure((16, 10))
+        fig.suptitle('Objectives Mapping Summary Dashboard', fontsize=20, fontweight='bold')
 
         # 2x2 grid
         ax1 = fig.add_subplot(2, 2, 1)  # Bar chart
@@ -273,11 +361,10 @@ class ObjectivesVizEngine:
         ax4 = fig.add_subplot(2, 2, 4)  # Summary stats
 
         # 1. Bar chart
-        objectives = list(OBJECTIVES_REFERENCE.keys())
-        counts = [coverage_data.get(obj, 0) for obj in objectives]
-        colors = [self.colors[obj] for obj in objectives]
+        objectives = _OBJ_KEYS
+        counts = _counts(coverage_data)
 
-        ax1.bar(objectives, counts, color=colors, edgecolor='white')
+        ax1.bar(objectives, counts, color=_COLOR_LIST, edgecolor='white')
         ax1.set_ylabel('Questions')
         ax1.set_title('Questions per Objective', fontweight='bold')
         for i, (obj, count) in enumerate(zip(objectives, counts)):
@@ -287,7 +374,7 @@ class ObjectivesVizEngine:
         non_zero = [(obj, count) for obj, count in zip(objectives, counts) if count > 0]
         if non_zero:
             pie_labels, pie_counts = zip(*non_zero)
-            pie_colors = [self.colors[obj] for obj in pie_labels]
+            pie_colors = [OBJECTIVE_COLORS[obj] for obj in pie_labels]
             ax2.pie(pie_counts, labels=pie_labels, colors=pie_colors,
                     autopct='%1.0f%%', startangle=90)
             ax2.set_title('Distribution', fontweight='bold')
@@ -302,11 +389,11 @@ class ObjectivesVizEngine:
 
         # 4. Summary stats
         ax4.axis('off')
-        total = sum(counts) if counts else 0
+        total = int(counts.sum())
         avg_conf = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
         high_conf = sum(1 for c in confidence_scores if c >= 0.85) if confidence_scores else 0
-        gaps = [obj for obj in objectives if coverage_data.get(obj, 0) == 0]
-        covered = len([obj for obj in objectives if coverage_data.get(obj, 0) > 0])
+        gaps = [obj for obj, count in zip(objectives, counts) if count == 0]
+        covered = int(np.count_nonzero(counts))
         high_conf_pct = (high_conf / total * 100) if total > 0 else 0
 
         stats_text = f"""
@@ -327,14 +414,7 @@ class ObjectivesVizEngine:
                  verticalalignment='top', fontfamily='monospace',
                  bbox=dict(boxstyle='round', facecolor='#f8f9fa', edgecolor='#dee2e6'))
 
-        plt.tight_layout(rect=[0, 0, 1, 0.95])
-
-        filename = f"objectives_dashboard_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_folder, filename)
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close()
-
-        return filepath
+        return self._save(fig, 'objectives_dashboard')
 
     def generate_all_charts(self, insights_data):
         """
@@ -349,12 +429,26 @@ class ObjectivesVizEngine:
         coverage = insights_data.get('coverage', {})
         confidence = insights_data.get('confidence_scores', [])
 
-        charts = {
-            'coverage_bar': self.generate_coverage_bar_chart(coverage),
-            'distribution_pie': self.generate_distribution_pie(coverage),
-            'confidence_histogram': self.generate_confidence_chart(confidence),
-            'gap_analysis': self.generate_gap_analysis(coverage),
-            'summary_dashboard': self.generate_summary_dashboard(coverage, confidence)
+        coverage = dict(coverage)
+        confidence = [float(c) for c in confidence]
+
+        pool = _chart_pool()
+        try:
+            return self._render_charts(pool, coverage, confidence)
+        except BrokenProcessPool:
+            # A worker died; rebuild the pool and retry once
+            print("[ERROR] Chart worker pool broke, restarting it")
+            _discard_chart_pool(pool)
+            return self._render_charts(_chart_pool(), coverage, confidence)
+
+    def _render_charts(self, pool, coverage, confidence):
+        """Render the five charts on pool, each in its own worker process"""
+        futures = {
+            'coverage_bar': pool.submit(self.generate_coverage_bar_chart, coverage),
+            'distribution_pie': pool.submit(self.generate_distribution_pie, coverage),
+            'confidence_histogram': pool.submit(self.generate_confidence_chart, confidence),
+            'gap_analysis': pool.submit(self.generate_gap_analysis, coverage),
+            'summary_dashboard': pool.submit(self.generate_summary_dashboard, coverage, confidence)
         }
 
-        return charts
+        return {name: future.result() for name, future in futures.items()}
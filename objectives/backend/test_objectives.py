@@ -10,6 +10,8 @@ Tests:
 
 Run: python -m pytest test_objectives.py -v
 Live test: python test_objectives.py --live
+Everything: python test_objectives.py --all
+Unit tests run in parallel when pytest-xdist is installed
 """
 
 import pytest
@@ -17,44 +19,52 @@ import os
 import sys
 import json
 import tempfile
+from collections import Counter
 import pandas as pd
 from datetime import datetime
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from objectives_engine import ObjectivesEngine, OBJECTIVES_REFERENCE
-from objectives_viz import ObjectivesVizEngine
+from objectives_engine import ObjectivesEngine, OBJECTIVES_REFERENCE, OBJECTIVES_KEYS, ZERO_COVERAGE
 
 
 # ============================================
 # Test Fixtures
 # ============================================
 
-@pytest.fixture
-def sample_questions_csv(tmp_path):
+# Sample unmapped questions, built once at import
+SAMPLE_QUESTIONS_DF = pd.DataFrame({
+    'Question Number': ['1.A', '1.B', '2', '3', '4 (Stem)', '5'],
+    'Question Type': ['Long Essay', 'Long Essay', 'Short Essay', 'Short Answer', 'Stem', 'MCQ'],
+    'Question Text': [
+        'Explain how bacteria cause urinary tract infections.',
+        'Discuss the laboratory diagnosis of tuberculosis.',
+        'Describe the host immune response to viral infections.',
+        'What are the prophylactic measures for malaria?',
+        'A 45 year old patient presents with fever...',  # Stem - should be skipped
+        'Which organism is commensal in the gut?'
+    ]
+})
+
+# The sample files are only read, so each is written once per session
+
+@pytest.fixture(scope="session")
+def sample_questions_csv(tmp_path_factory):
     """Create sample unmapped questions CSV"""
-    data = {
-        'Question Number': ['1.A', '1.B', '2', '3', '4 (Stem)', '5'],
-        'Question Type': ['Long Essay', 'Long Essay', 'Short Essay', 'Short Answer', 'Stem', 'MCQ'],
-        'Question Text': [
-            'Explain how bacteria cause urinary tract infections.',
-            'Discuss the laboratory diagnosis of tuberculosis.',
-            'Describe the host immune response to viral infections.',
-            'What are the prophylactic measures for malaria?',
-            'A 45 year old patient presents with fever...',  # Stem - should be skipped
-            'Which organism is commensal in the gut?'
-        ]
-    }
-    df = pd.DataFrame(data)
-    filepath = tmp_path / "test_questions.csv"
-    df.to_csv(filepath, index=False)
+    filepath = tmp_path_factory.mktemp("data") / "test_questions.csv"
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pcsv
+        pcsv.write_csv(pa.Table.from_pandas(SAMPLE_QUESTIONS_DF, preserve_index=False), str(filepath))
+    except ImportError:
+        SAMPLE_QUESTIONS_DF.to_csv(filepath, index=False, lineterminator='\n')
     return str(filepath)
 
 
-@pytest.fixture
-def sample_mapped_csv(tmp_path):
-    """Create sample pre-mapped questions CSV (for Tool 2)"""
+@pytest.fixture(scope="session")
+def sample_mapped_df():
+    """Sample pre-mapped questions (for Tool 2), in memory"""
     data = {
         'Question Number': ['1.A', '1.B', '2', '3'],
         'Question Type': ['Long Essay', 'Long Essay', 'Short Essay', 'Short Answer'],
@@ -67,14 +77,19 @@ def sample_mapped_csv(tmp_path):
         'mapped_objective': ['O1', 'O5', 'O4', 'O6'],  # Pre-existing mappings
         'confidence_score': [0.9, 0.85, 0.8, 0.95]
     }
-    df = pd.DataFrame(data)
-    filepath = tmp_path / "test_mapped.csv"
-    df.to_csv(filepath, index=False)
+    return pd.DataFrame(data)
+
+
+@pytest.fixture(scope="session")
+def sample_mapped_csv(tmp_path_factory, sample_mapped_df):
+    """Create sample pre-mapped questions CSV (for Tool 2), for tests that read the file"""
+    filepath = tmp_path_factory.mktemp("data") / "test_mapped.csv"
+    sample_mapped_df.to_csv(filepath, index=False)
     return str(filepath)
 
 
-@pytest.fixture
-def sample_mapped_with_errors_csv(tmp_path):
+@pytest.fixture(scope="session")
+def sample_mapped_with_errors_csv(tmp_path_factory):
     """Create sample with intentionally wrong mappings (for Tool 2)"""
     data = {
         'Question Number': ['1', '2', '3'],
@@ -88,29 +103,29 @@ def sample_mapped_with_errors_csv(tmp_path):
         'confidence_score': [0.9, 0.85, 0.95]
     }
     df = pd.DataFrame(data)
-    filepath = tmp_path / "test_mapped_errors.csv"
+    filepath = tmp_path_factory.mktemp("data") / "test_mapped_errors.csv"
     df.to_csv(filepath, index=False)
     return str(filepath)
 
 
-@pytest.fixture
-def empty_csv(tmp_path):
+@pytest.fixture(scope="session")
+def empty_csv(tmp_path_factory):
     """Create empty CSV with only headers"""
-    data = {
-        'Question Number': [],
-        'Question Type': [],
-        'Question Text': []
-    }
-    df = pd.DataFrame(data)
-    filepath = tmp_path / "test_empty.csv"
-    df.to_csv(filepath, index=False)
+    filepath = tmp_path_factory.mktemp("data") / "test_empty.csv"
+    filepath.write_text('Question Number,Question Type,Question Text\n')
     return str(filepath)
 
 
-@pytest.fixture
-def viz_engine(tmp_path):
-    """Create visualization engine with temp output folder"""
-    return ObjectivesVizEngine(output_folder=str(tmp_path / "insights"))
+@pytest.fixture(scope="module")
+def viz_engine(tmp_path_factory):
+    """Create visualization engine with temp output folder, shared by the chart tests"""
+    # Imported here so tests without charts never load matplotlib
+    # (objectives_viz selects the Agg backend on import)
+    from objectives_viz import ObjectivesVizEngine
+    import matplotlib.pyplot as plt
+
+    yield ObjectivesVizEngine(output_folder=str(tmp_path_factory.mktemp("insights")))
+    plt.close('all')
 
 
 # ============================================
@@ -127,13 +142,13 @@ class TestObjectivesReference:
     def test_objectives_keys(self):
         """Should have O1 through O6"""
         expected = {'O1', 'O2', 'O3', 'O4', 'O5', 'O6'}
-        assert set(OBJECTIVES_REFERENCE.keys()) == expected
+        assert OBJECTIVES_KEYS == expected
 
-    def test_objectives_have_descriptions(self):
+    @pytest.mark.parametrize('obj_id,desc', list(OBJECTIVES_REFERENCE.items()))
+    def test_objectives_have_descriptions(self, obj_id, desc):
         """Each objective should have a non-empty description"""
-        for obj_id, desc in OBJECTIVES_REFERENCE.items():
-            assert desc, f"{obj_id} has empty description"
-            assert len(desc) > 10, f"{obj_id} description too short"
+        assert desc, f"{obj_id} has empty description"
+        assert len(desc) > 10, f"{obj_id} description too short"
 
 
 # ============================================
@@ -148,11 +163,10 @@ class TestTool1MapQuestions:
         df = pd.read_csv(sample_questions_csv)
 
         # Count non-stem questions
-        non_stem = [q for q in df['Question Number'] if '(Stem)' not in str(q)]
-        stem = [q for q in df['Question Number'] if '(Stem)' in str(q)]
+        is_stem = df['Question Number'].astype(str).str.endswith('(Stem)')
 
-        assert len(non_stem) == 5
-        assert len(stem) == 1
+        assert int((~is_stem).sum()) == 5
+        assert int(is_stem.sum()) == 1
 
     def test_output_structure(self):
         """Mapping output should have required fields"""
@@ -172,11 +186,10 @@ class TestTool1MapQuestions:
         for field in required_fields:
             assert field in rec, f"Missing field: {field}"
 
-    def test_confidence_range(self):
+    @pytest.mark.parametrize('score', [0.0, 0.5, 0.85, 1.0])
+    def test_confidence_range(self, score):
         """Confidence scores should be between 0 and 1"""
-        test_scores = [0.0, 0.5, 0.85, 1.0]
-        for score in test_scores:
-            assert 0.0 <= score <= 1.0
+        assert 0.0 <= score <= 1.0
 
     def test_objective_id_valid(self):
         """Objective IDs should be O1-O6"""
@@ -236,18 +249,16 @@ class TestTool2RateMappings:
             {'rating': 'incorrect'}
         ]
 
-        correct = sum(1 for r in ratings if r['rating'] == 'correct')
-        partial = sum(1 for r in ratings if r['rating'] == 'partially_correct')
-        incorrect = sum(1 for r in ratings if r['rating'] == 'incorrect')
+        counts = Counter(r['rating'] for r in ratings)
 
-        assert correct == 2
-        assert partial == 1
-        assert incorrect == 1
+        assert counts['correct'] == 2
+        assert counts['partially_correct'] == 1
+        assert counts['incorrect'] == 1
 
-    def test_independent_from_tool1(self, sample_mapped_csv):
+    def test_independent_from_tool1(self, sample_mapped_df):
         """Tool 2 should work with ANY pre-mapped file, not just Tool 1 output"""
-        # Create a completely independent mapped file
-        df = pd.read_csv(sample_mapped_csv)
+        # A completely independent mapped file
+        df = sample_mapped_df
 
         # Verify it has the minimum required columns
         assert 'Question Number' in df.columns or 'question_num' in df.columns
@@ -255,8 +266,7 @@ class TestTool2RateMappings:
 
         # Should be able to extract existing mappings
         if 'mapped_objective' in df.columns:
-            mappings = df['mapped_objective'].tolist()
-            assert all(m in OBJECTIVES_REFERENCE for m in mappings if pd.notna(m))
+            assert df['mapped_objective'].dropna().isin(OBJECTIVES_KEYS).all()
 
 
 # ============================================
@@ -266,14 +276,12 @@ class TestTool2RateMappings:
 class TestTool3GenerateInsights:
     """Test Tool 3: Generate visualizations"""
 
-    def test_coverage_calculation(self, sample_mapped_csv):
+    def test_coverage_calculation(self, sample_mapped_df):
         """Should correctly calculate coverage per objective"""
-        df = pd.read_csv(sample_mapped_csv)
+        df = sample_mapped_df
 
-        coverage = {obj: 0 for obj in OBJECTIVES_REFERENCE.keys()}
-        for obj in df['mapped_objective']:
-            if pd.notna(obj) and obj in coverage:
-                coverage[obj] += 1
+        vc = df['mapped_objective'].value_counts()
+        coverage = {obj: int(vc.get(obj, 0)) for obj in OBJECTIVES_REFERENCE}
 
         assert coverage['O1'] == 1
         assert coverage['O5'] == 1
@@ -282,14 +290,12 @@ class TestTool3GenerateInsights:
         assert coverage['O2'] == 0  # Gap
         assert coverage['O3'] == 0  # Gap
 
-    def test_gap_identification(self, sample_mapped_csv):
+    def test_gap_identification(self, sample_mapped_df):
         """Should identify objectives with zero coverage"""
-        df = pd.read_csv(sample_mapped_csv)
+        df = sample_mapped_df
 
-        coverage = {obj: 0 for obj in OBJECTIVES_REFERENCE.keys()}
-        for obj in df['mapped_objective']:
-            if pd.notna(obj) and obj in coverage:
-                coverage[obj] += 1
+        vc = df['mapped_objective'].value_counts()
+        coverage = {obj: int(vc.get(obj, 0)) for obj in OBJECTIVES_REFERENCE}
 
         gaps = [obj for obj, count in coverage.items() if count == 0]
 
@@ -308,7 +314,7 @@ class TestTool3GenerateInsights:
 
     def test_viz_handles_empty_data(self, viz_engine):
         """Should handle empty data without crashing"""
-        coverage = {obj: 0 for obj in OBJECTIVES_REFERENCE.keys()}
+        coverage = dict(ZERO_COVERAGE)
         confidence_scores = []
 
         # Should not raise exception
@@ -370,22 +376,15 @@ class TestFullFlow:
         assert 'mapped_objective' in df_loaded.columns
         assert len(df_loaded) == 3
 
-    def test_flow_b_to_c(self, sample_mapped_csv, viz_engine):
+    def test_flow_b_to_c(self, sample_mapped_df, viz_engine):
         """Output from Tool 2 (or any mapped file) should work for Tool 3"""
-        df = pd.read_csv(sample_mapped_csv)
+        df = sample_mapped_df
 
         # Build insights data
-        coverage = {obj: 0 for obj in OBJECTIVES_REFERENCE.keys()}
-        confidence_scores = []
-
-        for _, row in df.iterrows():
-            obj = row.get('mapped_objective', '')
-            if pd.notna(obj) and obj in coverage:
-                coverage[obj] += 1
-
-            conf = row.get('confidence_score', 0.85)
-            if pd.notna(conf):
-                confidence_scores.append(float(conf))
+        vc = df['mapped_objective'].value_counts()
+        coverage = {obj: int(vc.get(obj, 0)) for obj in OBJECTIVES_REFERENCE}
+        confidence_scores = (df['confidence_score'].dropna().astype(float).tolist()
+                             if 'confidence_score' in df.columns else [])
 
         insights_data = {
             'coverage': coverage,
@@ -416,10 +415,8 @@ class TestEdgeCases:
     def test_missing_columns(self, tmp_path):
         """Should handle missing columns"""
         # CSV with wrong columns
-        data = {'col1': [1, 2], 'col2': ['a', 'b']}
-        df = pd.DataFrame(data)
         filepath = tmp_path / "wrong_columns.csv"
-        df.to_csv(filepath, index=False)
+        filepath.write_text('col1,col2\n1,a\n2,b\n')
 
         df_loaded = pd.read_csv(filepath)
 
@@ -427,22 +424,22 @@ class TestEdgeCases:
         has_question_text = 'Question Text' in df_loaded.columns
         assert not has_question_text  # Should be False
 
-    def test_invalid_objective_id(self):
+    @pytest.mark.parametrize('obj_id,valid', [
+        ('O1', True),
+        ('O7', False),  # Invalid
+        ('X1', False),  # Invalid
+    ])
+    def test_invalid_objective_id(self, obj_id, valid):
         """Should validate objective IDs"""
-        valid_ids = set(OBJECTIVES_REFERENCE.keys())
-
-        assert 'O1' in valid_ids
-        assert 'O7' not in valid_ids  # Invalid
-        assert 'X1' not in valid_ids  # Invalid
+        assert (obj_id in OBJECTIVES_KEYS) == valid
 
-    def test_confidence_bounds(self):
+    @pytest.mark.parametrize('conf,expected', [(1.5, 1.0), (-0.5, 0.0), (0.85, 0.85)])
+    def test_confidence_bounds(self, conf, expected):
         """Confidence should be clamped to 0-1"""
         def clamp_confidence(conf):
             return max(0.0, min(1.0, conf))
 
-        assert clamp_confidence(1.5) == 1.0
-        assert clamp_confidence(-0.5) == 0.0
-        assert clamp_confidence(0.85) == 0.85
+        assert clamp_confidence(conf) == expected
 
     def test_all_stems_file(self, tmp_path):
         """Should handle file with only stem questions"""
@@ -457,9 +454,9 @@ class TestEdgeCases:
 
         # Count non-stem questions
         df_loaded = pd.read_csv(filepath)
-        non_stem = [q for q in df_loaded['Question Number'] if '(Stem)' not in str(q)]
+        is_stem = df_loaded['Question Number'].astype(str).str.endswith('(Stem)')
 
-        assert len(non_stem) == 0
+        assert int((~is_stem).sum()) == 0
 
 
 # ============================================
@@ -542,14 +539,15 @@ class TestAPIContracts:
 # Live Integration Tests (Optional)
 # ============================================
 
+@pytest.mark.serial
 class TestLiveIntegration:
     """Live tests that require Azure OpenAI connection.
-    Run with: python test_objectives.py --live
+    Run serially (API rate limits) with: python test_objectives.py --live
     """
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def engine(self):
-        """Create engine with real credentials"""
+        """Create engine with real credentials, shared by the live tests"""
         from dotenv import load_dotenv
         load_dotenv()
 
@@ -601,14 +599,28 @@ class TestLiveIntegration:
 # ============================================
 
 if __name__ == '__main__':
+    import importlib.util
     import sys
 
-    if '--live' in sys.argv:
+    parallel = []
+
+    if '--all' in sys.argv:
+        # Unit and live tests in one run (live ones need Azure credentials)
+        print("Running ALL tests...")
+        mark = 'live or not live'
+    elif '--live' in sys.argv:
         # Run live tests only
         print("Running LIVE integration tests (requires Azure credentials)...")
-        pytest.main([__file__, '-v', '-m', 'live', '--tb=short'])
+        mark = 'live'
     else:
         # Run unit tests only (no Azure required)
         print("Running unit tests...")
-        print("(Use --live flag to run live integration tests)")
-        pytest.main([__file__, '-v', '-m', 'not live', '--tb=short'])
+        print("(Use --live flag to run live integration tests, --all for both)")
+        mark = 'not live and not serial'
+        # Unit tests share no mutable state: spread them over all cores
+        if importlib.util.find_spec('xdist'):
+            parallel = ['-n', 'auto']
+
+    # One pytest session; skip the cache plugin and any addopts from user config
+    pytest.main([__file__, '-v', '-m', mark, '--tb=short',
+                 '-p', 'no:cacheprovider', '-o', 'addopts='] + parallel)
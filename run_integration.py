@@ -34,19 +34,18 @@ def main():
             print("[ERROR] No .env or .env.example found!")
             sys.exit(1)
 
-    # Set environment variables for config
-    os.environ['HOST'] = args.host
-    os.environ['PORT'] = str(args.port)
-    os.environ['DEBUG'] = str(args.debug).lower()
-
     # Import and run
     try:
-        from integration import create_app, get_config
+        from dotenv import dotenv_values
+        from integration import create_app
+        from integration.config import from_env
 
-        config = get_config(args.env_file)
-        config.host = args.host
-        config.port = args.port
-        config.debug = args.debug
+        # Parse .env once; real environment variables win over it, as with
+        # load_dotenv, and command-line options win over both
+        env = {key: value for key, value in dotenv_values(args.env_file).items() if value is not None}
+        env.update(os.environ)
+        env.update({'HOST': args.host, 'PORT': str(args.port), 'DEBUG': str(args.debug).lower()})
+        config = from_env(env)
 
         app = create_app(config)
         app.run(